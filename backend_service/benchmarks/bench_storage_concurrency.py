@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Storage Concurrency Benchmark
+Drives /collect and /upload against in-process stand-ins for the Realtime
+Database and Cloud Storage that sleep for a simulated network latency, and
+compares the bounded storage executor with calling the clients inline on the
+event loop (the previous behaviour).
+
+Usage: python benchmarks/bench_storage_concurrency.py --requests 200 --latency 0.05
+Requires httpx (pip install httpx) in addition to the service requirements.
+"""
+
+import os
+import sys
+import time
+import types
+import asyncio
+import argparse
+import itertools
+import requests
+
+SIMULATED_LATENCY = 0.05
+
+class FakeRef:
+    """Stand-in for firebase_admin.db.Reference with a fixed round-trip time"""
+    _ids = itertools.count()
+
+    def __init__(self, path=""):
+        self.path = path
+        self.key = path.rsplit("/", 1)[-1]
+        self._client = types.SimpleNamespace(session=requests.Session())
+
+    def child(self, name):
+        return FakeRef(f"{self.path}/{name}")
+
+    def push(self, value=""):
+        time.sleep(SIMULATED_LATENCY)
+        return self.child(f"fake{next(self._ids)}")
+
+    def update(self, value):
+        time.sleep(SIMULATED_LATENCY)
+
+    def get(self):
+        time.sleep(SIMULATED_LATENCY)
+        return None
+
+class FakeBlob:
+    """Stand-in for google.cloud.storage.Blob"""
+    def __init__(self, name):
+        self.name = name
+
+    def exists(self):
+        time.sleep(SIMULATED_LATENCY)
+        return False
+
+    def upload_from_file(self, file_obj, **kwargs):
+        file_obj.read()
+        time.sleep(SIMULATED_LATENCY)
+
+class FakeBucket:
+    def blob(self, name):
+        return FakeBlob(name)
+
+class FakeStorageClient:
+    def __init__(self, *args, **kwargs):
+        self._http = requests.Session()
+
+    def bucket(self, name):
+        return FakeBucket()
+
+def install_fakes():
+    """Register fake firebase_admin / google.cloud.storage modules before importing main"""
+    firebase_admin = types.ModuleType("firebase_admin")
+    firebase_admin._apps = {}
+    firebase_admin.initialize_app = lambda *args, **kwargs: firebase_admin._apps.setdefault("[DEFAULT]", True)
+    credentials = types.ModuleType("firebase_admin.credentials")
+    credentials.ApplicationDefault = lambda: None
+    db = types.ModuleType("firebase_admin.db")
+    db.reference = lambda path="": FakeRef(path)
+    firebase_admin.credentials = credentials
+    firebase_admin.db = db
+
+    google = sys.modules.get("google") or types.ModuleType("google")
+    cloud = types.ModuleType("google.cloud")
+    storage = types.ModuleType("google.cloud.storage")
+    storage.Client = FakeStorageClient
+    cloud.storage = storage
+    google.cloud = cloud
+    api_core = types.ModuleType("google.api_core")
+    api_exceptions = types.ModuleType("google.api_core.exceptions")
+    api_exceptions.PreconditionFailed = type("PreconditionFailed", (Exception,), {})
+    api_core.exceptions = api_exceptions
+    google.api_core = api_core
+
+    sys.modules.update({
+        "firebase_admin": firebase_admin,
+        "firebase_admin.credentials": credentials,
+        "firebase_admin.db": db,
+        "google": google,
+        "google.cloud": cloud,
+        "google.cloud.storage": storage,
+        "google.api_core": api_core,
+        "google.api_core.exceptions": api_exceptions,
+    })
+
+async def run_inline(func, *args, **kwargs):
+    """Previous behaviour: call the blocking client directly on the event loop"""
+    return func(*args, **kwargs)
+
+async def fire(app, total, concurrency, run):
+    """Send total requests; content is unique per run so no run hits the duplicate fast path"""
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with semaphore:
+                if i % 2:
+                    response = await client.post("/upload", data={"source": "bench"},
+                                                 files={"file": (f"f{i}.txt", f"{run} {i}\n".encode() + b"x" * 1024)})
+                else:
+                    response = await client.post("/collect", data={
+                        "source": "bench", "type": "text", "content_text": f"{run} item {i}"
+                    })
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start
+
+def main():
+    global SIMULATED_LATENCY
+
+    parser = argparse.ArgumentParser(description="Benchmark backend storage concurrency")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent in-flight requests")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated storage latency in seconds")
+    args = parser.parse_args()
+    SIMULATED_LATENCY = args.latency
+
+    install_fakes()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import main as backend
+
+    executor_run = backend.run_blocking
+
+    backend.run_blocking = run_inline
+    inline_time = asyncio.run(fire(backend.app, args.requests, args.concurrency, "inline"))
+
+    backend.run_blocking = executor_run
+    executor_time = asyncio.run(fire(backend.app, args.requests, args.concurrency, "executor"))
+
+    print(f"Requests: {args.requests}  concurrency: {args.concurrency}  "
+          f"latency: {args.latency * 1000:.0f}ms  storage workers: {backend.STORAGE_MAX_WORKERS}")
+    print(f"  inline (blocking loop): {inline_time:6.2f}s  {args.requests / inline_time:8.1f} req/s")
+    print(f"  storage executor:       {executor_time:6.2f}s  {args.requests / executor_time:8.1f} req/s")
+    print(f"  speedup: {inline_time / executor_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
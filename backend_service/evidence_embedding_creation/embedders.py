@@ -0,0 +1,60 @@
+"""
+Embedding model backends for the evidence pipeline.
+Every backend has a name, the most inputs it accepts per request and
+embed(texts) -> one vector per text, in order.
+"""
+
+import hashlib
+import math
+import struct
+
+class VertexEmbedder:
+    """Vertex AI text embedding model"""
+
+    # gemini-embedding-001 takes a single input per request; the
+    # text-embedding/text-multilingual-embedding models take up to 250
+    SINGLE_INPUT_MODELS = ("gemini-embedding-001",)
+
+    def __init__(self, model_name="gemini-embedding-001", task_type=None):
+        # Imported here so the stub backend runs without the Vertex SDK
+        from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
+        self._input = TextEmbeddingInput
+        self.model = TextEmbeddingModel.from_pretrained(model_name)
+        self.name = model_name
+        self.task_type = task_type
+        self.max_batch_size = 1 if model_name in self.SINGLE_INPUT_MODELS else 250
+
+    def embed(self, texts):
+        inputs = [self._input(text, self.task_type) for text in texts]
+        return [embedding.values for embedding in self.model.get_embeddings(inputs)]
+
+class StubEmbedder:
+    """Deterministic local embedder for tests and dry runs: unit vectors seeded by the text's SHA-256"""
+
+    def __init__(self, dimensions=768, max_batch_size=250):
+        self.name = f"stub-{dimensions}"
+        self.dimensions = dimensions
+        self.max_batch_size = max_batch_size
+        self.calls = 0
+
+    def _vector(self, text):
+        values = []
+        block = 0
+        while len(values) < self.dimensions:
+            digest = hashlib.sha256(f"{block}\x1f{text}".encode("utf-8")).digest()
+            values.extend(value / 2 ** 31 - 1 for value in struct.unpack("<8I", digest))
+            block += 1
+        values = values[:self.dimensions]
+        norm = math.sqrt(sum(value * value for value in values)) or 1.0
+        return [value / norm for value in values]
+
+    def embed(self, texts):
+        self.calls += 1
+        return [self._vector(text) for text in texts]
+
+def get_embedder(backend="vertex", model_name="gemini-embedding-001"):
+    if backend == "vertex":
+        return VertexEmbedder(model_name)
+    if backend == "stub":
+        return StubEmbedder()
+    raise ValueError(f"Unknown embedding backend: {backend}")
@@ -0,0 +1,139 @@
+"""
+Persistent embedding cache.
+SQLite table of vectors keyed by (model name, SHA-256 of the normalized
+text), so a rerun over a mostly unchanged corpus only embeds new titles.
+
+    python embedding_cache.py stats
+    python embedding_cache.py compact --max-age-days 30 --keep-model gemini-embedding-001
+"""
+
+import sqlite3
+import hashlib
+import argparse
+import time
+import unicodedata
+from array import array
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+EMBEDDING_CACHE_FILE = os.getenv("EMBEDDING_CACHE_FILE", "embedding_cache.sqlite")
+# SQLite allows 999 bound parameters per statement in older builds
+LOOKUP_CHUNK = 500
+DAY = 24 * 60 * 60
+
+
+def text_key(text):
+    """SHA-256 of the text after NFKC normalization and whitespace collapsing"""
+    normalized = " ".join(unicodedata.normalize("NFKC", text).split())
+    return hashlib.sha256(normalized.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, path=EMBEDDING_CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def get_many(self, model, texts):
+        """Cached vector (or None) for each text, in order"""
+        keys = [text_key(text) for text in texts]
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        today = int(time.time() // DAY)
+        for start in range(0, len(unique), LOOKUP_CHUNK):
+            chunk = unique[start:start + LOOKUP_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                [model, *chunk]
+            )
+            found.update((key, array('f', vector).tolist()) for key, vector in rows)
+            # Recently used entries survive compaction; written at most once a day per entry
+            self.conn.execute(
+                f"UPDATE embeddings SET last_used = ? WHERE model = ? AND last_used < ? AND text_hash IN ({marks})",
+                [today, model, today, *chunk]
+            )
+
+        vectors = [found.get(key) for key in keys]
+        hits = sum(vector is not None for vector in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model, embeddings):
+        """Store {text: vector}; vectors are kept as float32"""
+        today = int(time.time() // DAY)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(model, text_key(text), array('f', vector).tobytes(), today) for text, vector in embeddings.items()]
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def stats(self):
+        """Entry count per model"""
+        rows = self.conn.execute("SELECT model, COUNT(*) FROM embeddings GROUP BY model")
+        return dict(rows.fetchall())
+
+    def compact(self, max_age_days=None, keep_models=None):
+        """
+        Delete entries not used in max_age_days and/or entries of models not
+        in keep_models, then reclaim the space. Returns the number deleted.
+        """
+        deleted = 0
+        if max_age_days is not None:
+            cutoff = int(time.time() // DAY) - max_age_days
+            deleted += self.conn.execute("DELETE FROM embeddings WHERE last_used < ?", (cutoff,)).rowcount
+        if keep_models:
+            marks = ",".join("?" * len(keep_models))
+            deleted += self.conn.execute(
+                f"DELETE FROM embeddings WHERE model NOT IN ({marks})", list(keep_models)
+            ).rowcount
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        return deleted
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or compact the embedding cache")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("--cache", default=EMBEDDING_CACHE_FILE, help="Cache database file")
+    parser.add_argument("--max-age-days", type=int, help="compact: evict entries unused for this many days")
+    parser.add_argument("--keep-model", action="append", help="compact: evict entries of every other model (repeatable)")
+    args = parser.parse_args()
+
+    cache = EmbeddingCache(args.cache)
+    try:
+        if args.command == "compact":
+            if args.max_age_days is None and not args.keep_model:
+                parser.error("compact needs --max-age-days and/or --keep-model")
+            deleted = cache.compact(args.max_age_days, args.keep_model)
+            print(f"Evicted {deleted} entries")
+        for model, count in cache.stats().items():
+            print(f"{model}: {count} entries")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
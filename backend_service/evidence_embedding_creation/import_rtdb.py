@@ -14,16 +14,28 @@ cred = credentials.Certificate("serviceAccountKey.json")
 firebase_admin.initialize_app(cred)
 
 db = firestore.client()
-# Load JSON file
-with open("evidence_embeddings_metadata.json","r") as f:
-    data = json.load(f)
-
+# Firestore accepts at most 500 writes per batch
+BATCH_SIZE = 500
 
 collection_ref = db.collection("evidence")  # collection name "articles"
-# If JSON is a dict
-for item in data:
-    doc_id = item["id"]  # use "id" field as document ID
-    collection_ref.document(doc_id).set(item)
-    print(f"Inserted document {doc_id}")
+# evidence_embeddings_metadata.json is JSON Lines: one item per line
+with open("evidence_embeddings_metadata.json","r") as f:
+    batch = db.batch()
+    pending = 0
+    for line in f:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        doc_id = item["id"]  # use "id" field as document ID
+        batch.set(collection_ref.document(doc_id), item)
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            print(f"Inserted {pending} documents (last: {doc_id})")
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+        print(f"Inserted {pending} documents")
 
 print("Data imported successfully to Realtime Database!")
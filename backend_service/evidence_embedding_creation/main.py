@@ -1,16 +1,37 @@
 import pandas as pd
-from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
 from tqdm import tqdm
 import json
-from google.cloud import storage
+import math
+import time
+import random
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
+from embedders import get_embedder
+from embedding_cache import EmbeddingCache, EMBEDDING_CACHE_FILE
 
 load_dotenv()
 
 bucket_name=os.getenv("BUCKET_NAME")
 
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "vertex")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "gemini-embedding-001")
+# Inputs per model request (capped by what the model accepts) and requests in flight
+BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "20"))
+CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "5"))
+# The CSV is read this many rows at a time instead of all at once
+CSV_CHUNK_ROWS = 10000
+# Seconds between checkpoints of the output written so far
+CHECKPOINT_INTERVAL = 10
+
+
 def upload_blob(source_file_name, destination_blob_name):
+    # Imported here so --no-upload runs (e.g. with the stub embedder) need no Cloud SDK
+    from google.cloud import storage
     storage_client = storage.Client()
     bucket = storage_client.bucket(bucket_name)
     blob = bucket.blob(destination_blob_name)
@@ -23,69 +44,194 @@ def upload_blob(source_file_name, destination_blob_name):
     )
 
 
-# Load embedding model
-model = TextEmbeddingModel.from_pretrained("gemini-embedding-001")
-
-BATCH_SIZE=20
-
-
-def embed_texts_in_batches(texts, batch_size=BATCH_SIZE):
-    embeddings = []
-    for i in tqdm(range(0, len(texts), batch_size)):
-        batch_texts = texts
-        for text in batch_texts:
-            text_input = TextEmbeddingInput(text)
-            embedding = model.get_embeddings([text_input])
-            embeddings.append(embedding[0].values)
-    print(len(embeddings[0]))
-    return embeddings
-
-
-
-df = pd.read_csv("bbc_news.csv")
-df = df.head(2)
-texts = df['title'].tolist()
-
-df['embedding'] = embed_texts_in_batches(texts)
-
-# Prepare full embeddings JSON
-embeddings_data = []
-for idx, row in df.iterrows():
-    json_line = {
-        "id": str(row.get('id', idx)),
-        "embedding": row['embedding'],
-        "metadata": {
-            "text": row['title'],
-            "description": row['description'],
-            "source": row.get('link', ''),
-            "guid": row.get('guid'),
-            "publishedDate": row.get('pubDate')
-        }
-    }
-    embeddings_data.append(json_line)
-
-with open("evidence_embeddings.json", "w") as f:
-    json.dump(embeddings_data, f, indent=4)
-
-upload_blob("evidence_embeddings.json","evidence_embeddings.json")
-# Prepare metadata-only JSON
-metadata_data = []
-for idx, row in df.iterrows():
-    json_line = {
-        "id": str(row.get('id', idx)),
-        "metadata": {
-            "text": row['title'],
-            "description": row['description'],
-            "source": row.get('link', ''),
-            "guid": row.get('guid'),
-            "publishedDate": row.get('pubDate')
-        }
-    }
-    metadata_data.append(json_line)
-
-with open("evidence_embeddings_metadata.json", "w") as f:
-    json.dump(metadata_data, f, indent=4)
-
-upload_blob("evidence_embeddings_metadata.json","evidence_embeddings_metadata.json")
-
-
+def clean(value):
+    """CSV cell as a JSON value (pandas reads empty cells as NaN)"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def iter_batches(csv_path, batch_size, skip_rows=0, limit=None, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Read the CSV in chunks and yield (rows consumed, [(id, title, metadata)])
+    batches; rows without a title are consumed but not embedded
+    """
+    reader = pd.read_csv(csv_path, chunksize=chunk_rows, skiprows=range(1, skip_rows + 1))
+    rows = (row for chunk in reader for row in chunk.to_dict("records"))
+    if limit is not None:
+        rows = itertools.islice(rows, max(0, limit - skip_rows))
+
+    batch, consumed = [], 0
+    for row_number, row in enumerate(rows, start=skip_rows):
+        title = clean(row.get('title'))
+        if title:
+            batch.append((str(clean(row.get('id')) or row_number), str(title), {
+                "text": title,
+                "description": clean(row.get('description')),
+                "source": clean(row.get('link')) or '',
+                "guid": clean(row.get('guid')),
+                "publishedDate": clean(row.get('pubDate'))
+            }))
+        consumed += 1
+        if len(batch) >= batch_size:
+            yield consumed, batch
+            batch, consumed = [], 0
+    if consumed:
+        yield consumed, batch
+
+
+def embed_with_retry(embedder, texts, max_retries=MAX_RETRIES):
+    """One model request, retried with exponential backoff and jitter"""
+    for attempt in range(max_retries + 1):
+        try:
+            vectors = embedder.embed(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+            return vectors
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = min(60, 2 ** attempt) * random.uniform(0.5, 1.5)
+            print(f"Embedding request failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def load_checkpoint(checkpoint_path, model_name, csv_path):
+    fresh = {"model": model_name, "csv": csv_path, "rows_done": 0, "output_bytes": 0, "metadata_bytes": 0}
+    if not os.path.exists(checkpoint_path):
+        return fresh
+    with open(checkpoint_path, "r") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("model") != model_name or checkpoint.get("csv") != csv_path:
+        print(f"Checkpoint {checkpoint_path} is for another model or CSV - starting over")
+        return fresh
+    return checkpoint
+
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def open_for_resume(path, offset):
+    """Open an output file positioned at offset, dropping anything written after the last checkpoint"""
+    f = open(path, "r+b" if os.path.exists(path) else "wb")
+    f.truncate(offset)
+    f.seek(offset)
+    return f
+
+
+def run_pipeline(csv_path, embedder, output_path, metadata_path, checkpoint_path,
+                 batch_size=BATCH_SIZE, concurrency=CONCURRENCY, limit=None, restart=False, cache=None):
+    """
+    Embed every title in the CSV and write JSON Lines embedding and metadata
+    files. Batches are embedded concurrently but written in CSV order, and a
+    checkpoint of the rows written lets an interrupted run resume. Titles
+    found in the cache (an EmbeddingCache) are not sent to the model.
+    """
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = load_checkpoint(checkpoint_path, embedder.name, csv_path)
+    if checkpoint["rows_done"]:
+        print(f"Resuming after {checkpoint['rows_done']} rows")
+
+    batch_size = max(1, min(batch_size, embedder.max_batch_size))
+    output = open_for_resume(output_path, checkpoint["output_bytes"])
+    metadata_output = open_for_resume(metadata_path, checkpoint["metadata_bytes"])
+    progress = tqdm(initial=checkpoint["rows_done"], unit="rows")
+    last_saved = time.monotonic()
+
+    def write(consumed, batch, vectors, missing, future):
+        if future:
+            embedded = dict(zip(missing, future.result()))
+            if cache:
+                cache.put_many(embedder.name, embedded)
+            vectors = [embedded[text] if vector is None else vector
+                       for (_, text, _), vector in zip(batch, vectors)]
+        for (doc_id, _, metadata), vector in zip(batch, vectors):
+            output.write((json.dumps({"id": doc_id, "embedding": vector, "metadata": metadata}) + "\n").encode("utf-8"))
+            metadata_output.write((json.dumps({"id": doc_id, "metadata": metadata}) + "\n").encode("utf-8"))
+        checkpoint["rows_done"] += consumed
+        progress.update(consumed)
+
+    def save():
+        if cache:
+            cache.commit()
+        output.flush()
+        metadata_output.flush()
+        checkpoint["output_bytes"] = output.tell()
+        checkpoint["metadata_bytes"] = metadata_output.tell()
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    # Futures in submission order; at most 2 * concurrency batches are held in memory
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for consumed, batch in iter_batches(csv_path, batch_size, checkpoint["rows_done"], limit):
+            texts = [text for _, text, _ in batch]
+            vectors = cache.get_many(embedder.name, texts) if cache else [None] * len(texts)
+            # Only titles the cache doesn't have go to the model, each once
+            missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+            future = executor.submit(embed_with_retry, embedder, missing) if missing else None
+            pending.append((consumed, batch, vectors, missing, future))
+            while pending and (len(pending) >= 2 * concurrency or not pending[0][-1] or pending[0][-1].done()):
+                write(*pending.popleft())
+                if time.monotonic() - last_saved >= CHECKPOINT_INTERVAL:
+                    save()
+                    last_saved = time.monotonic()
+        while pending:
+            write(*pending.popleft())
+    finally:
+        # Everything written in order so far is kept for the next run
+        executor.shutdown(wait=True, cancel_futures=True)
+        save()
+        output.close()
+        metadata_output.close()
+        progress.close()
+
+    os.remove(checkpoint_path)
+    print(f"Embedded {checkpoint['rows_done']} rows with {embedder.name}")
+    if cache:
+        print(f"Embedding cache: {cache.hits} hits, {cache.misses} misses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed evidence article titles for vector search")
+    parser.add_argument("--csv", default="bbc_news.csv", help="Articles CSV (title, description, link, guid, pubDate)")
+    parser.add_argument("--limit", type=int, help="Only embed the first N rows")
+    parser.add_argument("--backend", default=EMBEDDING_BACKEND, choices=["vertex", "stub"],
+                        help="Embedding model backend (stub: deterministic local vectors)")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Vertex AI embedding model")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Inputs per model request")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Model requests in flight")
+    parser.add_argument("--output", default="evidence_embeddings.json")
+    parser.add_argument("--metadata-output", default="evidence_embeddings_metadata.json")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the first row")
+    parser.add_argument("--cache", default=EMBEDDING_CACHE_FILE, help="Embedding cache database file")
+    parser.add_argument("--no-cache", action="store_true", help="Embed every title, ignoring the cache")
+    parser.add_argument("--no-upload", action="store_true", help="Don't upload the output files to the bucket")
+    args = parser.parse_args()
+
+    embedder = get_embedder(args.backend, args.model)
+    cache = None if args.no_cache else EmbeddingCache(args.cache)
+    try:
+        run_pipeline(
+            args.csv, embedder, args.output, args.metadata_output,
+            args.checkpoint or f"{args.output}.checkpoint",
+            batch_size=args.batch_size, concurrency=args.concurrency,
+            limit=args.limit, restart=args.restart, cache=cache
+        )
+    finally:
+        if cache:
+            cache.close()
+
+    if not args.no_upload:
+        upload_blob(args.output, args.output)
+        upload_blob(args.metadata_output, args.metadata_output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from google.cloud import storage
+from google.api_core import exceptions as gcs_exceptions
 import firebase_admin
 from firebase_admin import credentials, db
+from requests.adapters import HTTPAdapter
 import os
 from dotenv import load_dotenv
 import json
+import hashlib
+import tempfile
 import logging
+import random
+import asyncio
+import functools
+import threading
+import time
+import unicodedata
+import itertools
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +30,21 @@ load_dotenv()
 
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "misinfo-tool-bucket-1755447699")
 FIREBASE_DATABASE_URL = os.getenv("FIREBASE_DATABASE_URL", "https://misinfo-469304-default-rtdb.firebaseio.com/")
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "500"))
+# Uploads are read in UPLOAD_CHUNK_SIZE pieces and kept in memory up to
+# UPLOAD_SPOOL_MAX_MEMORY before spilling to a temp file
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", str(8 * 1024 * 1024)))
+# GCS resumable upload chunk size, must be a multiple of 256 KiB
+GCS_RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+# Upper bound on concurrent blocking Firebase/GCS calls per worker process
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "32"))
+# Images whose 64-bit pHashes differ in at most this many bits are linked as
+# near duplicates (resizing plus JPEG recompression typically flips 2-6).
+# Distances 0-3 cost 4 index reads per lookup, 4-7 cost 68.
+IMAGE_MATCH_DISTANCE = int(os.getenv("IMAGE_MATCH_DISTANCE", "6"))
+IMAGE_HASH_SEGMENTS = 4
+IMAGE_MATCHES_STORED = 10
 
 logger.info(f"GCS Bucket: {GCS_BUCKET_NAME}")
 logger.info(f"Firebase URL: {FIREBASE_DATABASE_URL}")
@@ -29,6 +58,17 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+def widen_connection_pool(session, pool_size):
+    """Give a requests session enough keep-alive connections for the storage executor"""
+    current = session.get_adapter("https://")
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=getattr(current, "max_retries", 0)
+    )
+    session.mount("https://", adapter)
+    return session
+
 try:
     if not firebase_admin._apps:
         cred = credentials.ApplicationDefault()
@@ -37,15 +77,258 @@ try:
         })
     
     database = db.reference()
+    rtdb_client = getattr(database, "_client", None)
+    if rtdb_client is not None and hasattr(rtdb_client, "session"):
+        widen_connection_pool(rtdb_client.session, STORAGE_MAX_WORKERS)
     logger.info("Firebase Realtime Database initialized successfully")
     
     storage_client = storage.Client()
+    widen_connection_pool(storage_client._http, STORAGE_MAX_WORKERS)
     bucket = storage_client.bucket(GCS_BUCKET_NAME)
     logger.info(f"Cloud Storage client initialized for bucket: {GCS_BUCKET_NAME}")
 except Exception as e:
     logger.error(f"Failed to initialize Google Cloud clients: {e}")
     raise
 
+# firebase_admin and google-cloud-storage are synchronous; run their calls here
+# so the event loop keeps serving other requests while they wait on the network
+storage_executor = ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking storage call on the bounded executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(storage_executor, functools.partial(func, *args, **kwargs))
+
+@app.on_event("shutdown")
+def shutdown_storage_executor():
+    storage_executor.shutdown(wait=True)
+
+# Firebase push-ID alphabet; IDs sort lexicographically by creation time
+PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+_push_id_lock = threading.Lock()
+_last_push_time = 0
+_last_rand_chars = [0] * 12
+
+def generate_push_id():
+    """Generate a Firebase-style push ID locally, without a database round-trip"""
+    global _last_push_time
+    with _push_id_lock:
+        now = int(time.time() * 1000)
+        duplicate_time = now == _last_push_time
+        _last_push_time = now
+        
+        time_chars = []
+        for _ in range(8):
+            time_chars.append(PUSH_CHARS[now % 64])
+            now //= 64
+        push_id = "".join(reversed(time_chars))
+        
+        if not duplicate_time:
+            for i in range(12):
+                _last_rand_chars[i] = random.randrange(64)
+        else:
+            # Same millisecond: increment the random part so IDs stay unique and ordered
+            i = 11
+            while i >= 0 and _last_rand_chars[i] == 63:
+                _last_rand_chars[i] = 0
+                i -= 1
+            if i >= 0:
+                _last_rand_chars[i] += 1
+        
+        return push_id + "".join(PUSH_CHARS[c] for c in _last_rand_chars)
+
+# Metadata keys that identify an item on its platform, most specific first.
+# social_source/dedup.py uses the same list - keep them in sync.
+PLATFORM_ID_KEYS = ("post_id", "tweet_id", "video_id", "link", "url", "file_path")
+# Metadata key holding a file's SHA-256, so an edited file at the same path is new content
+CONTENT_HASH_KEY = "content_sha256"
+# Recently seen fingerprint -> doc_id, so hot duplicates skip the index read
+RECENT_FINGERPRINTS_MAX = 50000
+_recent_fingerprints = OrderedDict()
+_recent_fingerprints_lock = threading.Lock()
+
+def content_fingerprint(source, content_text, metadata):
+    """SHA-256 over source, platform ID, normalized (NFKC, case-folded) text and the file hash if any"""
+    platform_id = ""
+    if isinstance(metadata, dict):
+        platform_id = next((str(metadata[key]) for key in PLATFORM_ID_KEYS if metadata.get(key)), "")
+    text = " ".join(unicodedata.normalize("NFKC", content_text or "").casefold().split())
+    parts = [source or "", platform_id, text]
+    if isinstance(metadata, dict) and metadata.get(CONTENT_HASH_KEY):
+        parts.append(str(metadata[CONTENT_HASH_KEY]))
+    key = "\x1f".join(parts)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def remember_fingerprint(fingerprint, doc_id):
+    with _recent_fingerprints_lock:
+        _recent_fingerprints[fingerprint] = doc_id
+        _recent_fingerprints.move_to_end(fingerprint)
+        while len(_recent_fingerprints) > RECENT_FINGERPRINTS_MAX:
+            _recent_fingerprints.popitem(last=False)
+
+async def find_existing_doc(fingerprint):
+    """O(1) lookup of an already-stored item by fingerprint via /content_index"""
+    with _recent_fingerprints_lock:
+        doc_id = _recent_fingerprints.get(fingerprint)
+    if doc_id:
+        return doc_id
+    doc_id = await run_blocking(database.child("content_index").child(fingerprint).get)
+    if doc_id:
+        remember_fingerprint(fingerprint, doc_id)
+    return doc_id
+
+# Near-duplicate image index (multi-index hashing). A pHash is split into
+# IMAGE_HASH_SEGMENTS 16-bit segments and listed under
+# /image_index/s<segment number>/<segment value>/<phash> = first doc_id.
+# Two hashes within distance d share at least one segment that differs in at
+# most d // IMAGE_HASH_SEGMENTS bits, so a query reads a few small buckets
+# instead of scanning every image. Every sighting of a hash is kept under
+# /image_sightings/<phash>/<doc_id>.
+SEGMENT_BITS = 64 // IMAGE_HASH_SEGMENTS
+PHASH_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+def image_hash_segments(phash):
+    value = int(phash, 16)
+    mask = (1 << SEGMENT_BITS) - 1
+    return [(value >> (SEGMENT_BITS * (IMAGE_HASH_SEGMENTS - 1 - i))) & mask for i in range(IMAGE_HASH_SEGMENTS)]
+
+def segment_key(segment):
+    return f"{segment:0{SEGMENT_BITS // 4}x}"
+
+def hamming_distance(hash_a, hash_b):
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+def segment_variants(segment, radius):
+    """All segment values within radius bits of segment"""
+    variants = [segment]
+    for flips in range(1, radius + 1):
+        for bits in itertools.combinations(range(SEGMENT_BITS), flips):
+            variants.append(segment ^ sum(1 << bit for bit in bits))
+    return variants
+
+def record_phash(record):
+    """Normalized pHash from a record's metadata, or None"""
+    phash = str(record["metadata"].get("phash") or "").lower()
+    return phash if PHASH_PATTERN.match(phash) else None
+
+async def find_similar_images(phash, max_distance=IMAGE_MATCH_DISTANCE):
+    """Indexed images within max_distance of phash: [{phash, doc_id, distance}], closest first"""
+    radius = max_distance // IMAGE_HASH_SEGMENTS
+    lookups = [
+        (position, variant)
+        for position, segment in enumerate(image_hash_segments(phash))
+        for variant in segment_variants(segment, radius)
+    ]
+    buckets = await asyncio.gather(*(
+        run_blocking(database.child("image_index").child(f"s{position}").child(segment_key(variant)).get)
+        for position, variant in lookups
+    ))
+    
+    matches = {}
+    for bucket in buckets:
+        for candidate, doc_id in (bucket or {}).items():
+            if candidate not in matches:
+                distance = hamming_distance(phash, candidate)
+                if distance <= max_distance:
+                    matches[candidate] = {"phash": candidate, "doc_id": doc_id, "distance": distance}
+    return sorted(matches.values(), key=lambda match: match["distance"])
+
+def image_index_updates(phash, doc_id, matches):
+    """Multi-path updates that record a sighting and index a previously unseen hash"""
+    updates = {f"image_sightings/{phash}/{doc_id}": True}
+    if not any(match["distance"] == 0 for match in matches):
+        for position, segment in enumerate(image_hash_segments(phash)):
+            updates[f"image_index/s{position}/{segment_key(segment)}/{phash}"] = doc_id
+    return updates
+
+# Ingest rollups: every stored item increments counters in a small document
+# per UTC day, /rollups/daily/<YYYY-MM-DD>/{total, by_source, by_platform,
+# by_type}, in the same multi-path update that stores it. Reports read one
+# document per day instead of scanning /content. Each stored item's result
+# carries its platform, so clients never need a copy of this mapping.
+TYPE_PLATFORMS = {
+    "video": "youtube",
+    "tweet": "twitter",
+    "reddit_post": "reddit",
+    "news_article": "news",
+    "pdf_document": "documents",
+    "pdf_document_chunk": "documents",
+    "word_document": "documents",
+    "text_document": "documents",
+    "text_document_segment": "documents",
+    "image_file": "documents",
+    "video_file": "documents",
+    "unknown_file": "documents",
+    "file": "uploads"
+}
+ROLLUP_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Characters RTDB does not allow in keys
+ROLLUP_KEY_PATTERN = re.compile(r"[.$#\[\]/\x00-\x1f\x7f]")
+
+def rollup_key(value):
+    return ROLLUP_KEY_PATTERN.sub("_", str(value or "unknown"))[:200] or "unknown"
+
+def content_platform(record):
+    platform = record["metadata"].get("platform") if isinstance(record["metadata"], dict) else None
+    return str(platform or TYPE_PLATFORMS.get(record["type"], "other"))
+
+def rollup_updates(records):
+    """Multi-path increments counting records into their day's rollup document"""
+    counts = {}
+    for record in records:
+        day = f"rollups/daily/{record['timestamp'][:10]}"
+        for path in (
+            f"{day}/total",
+            f"{day}/by_source/{rollup_key(record['source'])}",
+            f"{day}/by_platform/{rollup_key(content_platform(record))}",
+            f"{day}/by_type/{rollup_key(record['type'])}"
+        ):
+            counts[path] = counts.get(path, 0) + 1
+    return {path: {".sv": {"increment": count}} for path, count in counts.items()}
+
+def build_content_record(source, type, content_text="", metadata=None):
+    """Validate one collected item and build the record stored under /content"""
+    if not source or not type:
+        raise ValueError("Source and type are required")
+    
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata) if metadata else {}
+        except json.JSONDecodeError:
+            raise ValueError("Invalid JSON in metadata")
+    if metadata is not None and not isinstance(metadata, dict):
+        raise ValueError("Metadata must be a JSON object")
+    
+    return {
+        "source": source,
+        "type": type,
+        "content_text": content_text or "",
+        "metadata": metadata or {},
+        "content_hash": content_fingerprint(source, content_text, metadata),
+        "status": "pending",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+def parse_batch_body(body, content_type):
+    """Parse a JSON array or NDJSON body into a list of items (or per-line errors)"""
+    text = body.decode("utf-8")
+    
+    if "ndjson" not in content_type and text.lstrip().startswith("["):
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError("Expected a JSON array of items")
+        return items
+    
+    items = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            items.append(ValueError(f"Invalid JSON on line {line_no}: {e.msg}"))
+    return items
+
 @app.post("/collect")
 async def collect_data(
     source: str = Form(...),
@@ -54,29 +337,278 @@ async def collect_data(
     metadata: str = Form("{}")
 ):
     try:
-        metadata_dict = json.loads(metadata) if isinstance(metadata, str) else metadata
+        try:
+            record = build_content_record(source, type, content_text, metadata)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        if not source or not type:
-            raise HTTPException(status_code=400, detail="Source and type are required")
+        fingerprint = record["content_hash"]
+        existing_doc_id = await find_existing_doc(fingerprint)
+        if existing_doc_id:
+            logger.info(f"Duplicate content, returning existing doc_id: {existing_doc_id}")
+            return {"status": "success", "doc_id": existing_doc_id, "duplicate": True}
         
-        content_ref = database.child("content").push({
-            "source": source,
-            "type": type,
-            "content_text": content_text,
-            "metadata": metadata_dict,
-            "status": "pending",
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        # Content and its index entries go out in one multi-path update
+        doc_id = generate_push_id()
+        updates = {f"content_index/{fingerprint}": doc_id}
+        phash = record_phash(record)
+        if phash:
+            matches = await find_similar_images(phash)
+            if matches:
+                record["image_matches"] = matches[:IMAGE_MATCHES_STORED]
+            updates.update(image_index_updates(phash, doc_id, matches))
+        updates[f"content/{doc_id}"] = record
+        updates.update(rollup_updates([record]))
+        await run_blocking(database.update, updates)
+        remember_fingerprint(fingerprint, doc_id)
         
-        logger.info(f"Data collected successfully with doc_id: {content_ref.key}")
-        return {"status": "success", "doc_id": content_ref.key}
+        logger.info(f"Data collected successfully with doc_id: {doc_id}")
+        return {"status": "success", "doc_id": doc_id, "platform": content_platform(record)}
         
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON in metadata")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error collecting data: {e}")
         raise HTTPException(status_code=500, detail="Failed to collect data")
 
+@app.post("/collect/batch")
+async def collect_batch(request: Request):
+    """
+    Ingest many items in one request. Accepts a JSON array or NDJSON
+    (one item per line) and writes every valid, previously unseen item to
+    /content in a single multi-path update. Returns per-item doc IDs and
+    errors; duplicates get the doc ID of the stored copy.
+    """
+    try:
+        items = parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+    
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_ITEMS} items")
+    
+    results = [None] * len(items)
+    records = {}
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not isinstance(item, dict):
+                raise ValueError("Item must be a JSON object")
+            records[index] = build_content_record(
+                item.get("source"),
+                item.get("type"),
+                item.get("content_text", ""),
+                item.get("metadata", {})
+            )
+        except ValueError as e:
+            results[index] = {"index": index, "status": "error", "error": str(e)}
+    
+    # First occurrence of each fingerprint within the batch
+    first_index = {}
+    for index, record in records.items():
+        first_index.setdefault(record["content_hash"], index)
+    
+    try:
+        fingerprints = list(first_index)
+        existing = await asyncio.gather(*(find_existing_doc(fp) for fp in fingerprints))
+    except Exception as e:
+        logger.error(f"Error checking batch for duplicates: {e}")
+        raise HTTPException(status_code=500, detail="Failed to collect batch")
+    doc_ids = dict(zip(fingerprints, existing))
+    
+    new_indexes = [
+        index for index, record in records.items()
+        if not doc_ids[record["content_hash"]] and first_index[record["content_hash"]] == index
+    ]
+    phashes = {index: record_phash(records[index]) for index in new_indexes}
+    try:
+        image_lookups = [phash for phash in set(phashes.values()) if phash]
+        image_matches = dict(zip(
+            image_lookups,
+            await asyncio.gather(*(find_similar_images(phash) for phash in image_lookups))
+        ))
+    except Exception as e:
+        logger.error(f"Error checking batch for similar images: {e}")
+        raise HTTPException(status_code=500, detail="Failed to collect batch")
+    
+    updates = {}
+    stored_records = []
+    duplicates = 0
+    batch_images = []
+    for index, record in records.items():
+        fingerprint = record["content_hash"]
+        if doc_ids[fingerprint] or first_index[fingerprint] != index:
+            duplicates += 1
+            results[index] = {"index": index, "status": "success", "duplicate": True}
+            continue
+        doc_id = generate_push_id()
+        doc_ids[fingerprint] = doc_id
+        phash = phashes[index]
+        if phash:
+            # Earlier images of this same batch are not in the index yet
+            matches = image_matches[phash] + [
+                {"phash": other, "doc_id": other_doc_id, "distance": hamming_distance(phash, other)}
+                for other, other_doc_id in batch_images
+                if hamming_distance(phash, other) <= IMAGE_MATCH_DISTANCE
+            ]
+            matches.sort(key=lambda match: match["distance"])
+            if matches:
+                record["image_matches"] = matches[:IMAGE_MATCHES_STORED]
+            updates.update(image_index_updates(phash, doc_id, matches))
+            batch_images.append((phash, doc_id))
+        updates[f"content/{doc_id}"] = record
+        updates[f"content_index/{fingerprint}"] = doc_id
+        stored_records.append(record)
+        results[index] = {"index": index, "status": "success", "platform": content_platform(record)}
+    updates.update(rollup_updates(stored_records))
+    
+    for index, record in records.items():
+        results[index]["doc_id"] = doc_ids[record["content_hash"]]
+    
+    if updates:
+        try:
+            await run_blocking(database.update, updates)
+        except Exception as e:
+            logger.error(f"Error writing batch: {e}")
+            raise HTTPException(status_code=500, detail="Failed to collect batch")
+        for fingerprint, index in first_index.items():
+            remember_fingerprint(fingerprint, doc_ids[fingerprint])
+    
+    stored = len(records) - duplicates
+    failed = len(items) - len(records)
+    logger.info(f"Batch collected: {stored} stored, {duplicates} duplicates, {failed} rejected")
+    return {
+        "status": "success" if not failed else "partial",
+        "stored": stored,
+        "duplicates": duplicates,
+        "failed": failed,
+        "results": results
+    }
+
+@app.get("/images/similar")
+async def similar_images(phash: str, max_distance: int = IMAGE_MATCH_DISTANCE):
+    """Earlier sightings of images whose pHash is within max_distance bits"""
+    phash = phash.lower()
+    if not PHASH_PATTERN.match(phash):
+        raise HTTPException(status_code=400, detail="phash must be 16 hex digits")
+    if not 0 <= max_distance <= 2 * IMAGE_HASH_SEGMENTS - 1:
+        raise HTTPException(status_code=400, detail=f"max_distance must be between 0 and {2 * IMAGE_HASH_SEGMENTS - 1}")
+    
+    try:
+        matches = await find_similar_images(phash, max_distance)
+        sightings = await asyncio.gather(*(
+            run_blocking(database.child("image_sightings").child(match["phash"]).get)
+            for match in matches
+        ))
+    except Exception as e:
+        logger.error(f"Error querying similar images: {e}")
+        raise HTTPException(status_code=500, detail="Failed to query similar images")
+    
+    for match, seen in zip(matches, sightings):
+        match["sightings"] = sorted(seen or {})
+    return {"phash": phash, "max_distance": max_distance, "matches": matches}
+
+@app.get("/reports/daily/{date}")
+async def daily_report(date: str):
+    """Items stored on one UTC day (YYYY-MM-DD), by source, platform and type"""
+    if not ROLLUP_DATE_PATTERN.match(date):
+        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+    
+    try:
+        rollup = await run_blocking(database.child("rollups").child("daily").child(date).get)
+    except Exception as e:
+        logger.error(f"Error reading rollup for {date}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to read daily report")
+    
+    rollup = rollup or {}
+    return {
+        "date": date,
+        "total": rollup.get("total", 0),
+        "by_source": rollup.get("by_source", {}),
+        "by_platform": rollup.get("by_platform", {}),
+        "by_type": rollup.get("by_type", {})
+    }
+
+async def spool_and_hash(chunks):
+    """Spool an async byte stream to a temp file while computing its SHA-256"""
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MEMORY)
+    digest = hashlib.sha256()
+    size = 0
+    async for chunk in chunks:
+        digest.update(chunk)
+        spool.write(chunk)
+        size += len(chunk)
+    spool.seek(0)
+    return spool, digest.hexdigest(), size
+
+async def iter_upload_file(file):
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+def store_content_addressed(spool, content_hash, content_type):
+    """
+    Store a spooled file under its content hash. Returns (blob_name, stored);
+    stored is False when an identical file already exists and nothing was written.
+    """
+    blob_name = f"sha256/{content_hash[:2]}/{content_hash}"
+    blob = bucket.blob(blob_name)
+    if blob.exists():
+        return blob_name, False
+    
+    # Setting chunk_size makes the client use a resumable, chunked upload
+    blob.chunk_size = GCS_RESUMABLE_CHUNK_SIZE
+    try:
+        blob.upload_from_file(spool, content_type=content_type, if_generation_match=0)
+    except gcs_exceptions.PreconditionFailed:
+        # Another request stored the same content between exists() and upload
+        return blob_name, False
+    return blob_name, True
+
+async def save_upload(chunks, filename, content_type, source):
+    """Hash, deduplicate, store and record an uploaded file"""
+    spool, content_hash, size = await spool_and_hash(chunks)
+    try:
+        blob_name, stored = await run_blocking(store_content_addressed, spool, content_hash, content_type)
+    finally:
+        spool.close()
+    
+    file_url = f"gs://{GCS_BUCKET_NAME}/{blob_name}"
+    
+    doc_id = generate_push_id()
+    record = {
+        "source": source,
+        "type": "file",
+        "file_url": file_url,
+        "content_hash": content_hash,
+        "metadata": {
+            "filename": filename,
+            "content_type": content_type,
+            "size": size,
+            "content_hash": content_hash
+        },
+        "status": "pending",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    updates = {f"content/{doc_id}": record}
+    updates.update(rollup_updates([record]))
+    await run_blocking(database.update, updates)
+    
+    logger.info(f"File uploaded: {filename} sha256={content_hash} ({'stored' if stored else 'already stored'})")
+    return {
+        "status": "success",
+        "file_url": file_url,
+        "doc_id": doc_id,
+        "content_hash": content_hash,
+        "size": size,
+        "deduplicated": not stored
+    }
+
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...), source: str = Form(...)):
     try:
@@ -86,25 +618,31 @@ async def upload_file(file: UploadFile = File(...), source: str = Form(...)):
         if not source:
             raise HTTPException(status_code=400, detail="Source is required")
         
-        blob = bucket.blob(file.filename)
-        blob.upload_from_file(file.file)
-        
-        file_url = f"gs://{GCS_BUCKET_NAME}/{file.filename}"
+        return await save_upload(iter_upload_file(file), file.filename, file.content_type, source)
         
-        file_ref = database.child("content").push({
-            "source": source,
-            "type": "file",
-            "file_url": file_url,
-            "metadata": {"filename": file.filename, "content_type": file.content_type},
-            "status": "pending",
-            "timestamp": datetime.utcnow().isoformat()
-        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error uploading file: {e}")
+        raise HTTPException(status_code=500, detail="Failed to upload file")
+
+@app.post("/upload/stream")
+async def upload_stream(request: Request, source: str, filename: str):
+    """
+    Stream a raw request body (no multipart) straight through the hasher,
+    e.g. curl --data-binary @video.mp4 ".../upload/stream?source=cli&filename=video.mp4"
+    """
+    try:
+        if not source or not filename:
+            raise HTTPException(status_code=400, detail="Source and filename are required")
         
-        logger.info(f"File uploaded successfully: {file.filename}")
-        return {"status": "success", "file_url": file_url, "doc_id": file_ref.key}
+        content_type = request.headers.get("content-type", "application/octet-stream")
+        return await save_upload(request.stream(), filename, content_type, source)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error uploading file: {e}")
+        logger.error(f"Error streaming upload: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload file")
 
 @app.get("/health")
@@ -13,19 +13,21 @@ from datetime import datetime
 # Add the social_source directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'social_source'))
 
+from backend_sink import get_default_sink
+
 # Import available modules
 TWITTER_AVAILABLE = False
 YOUTUBE_AVAILABLE = False
 
 try:
-    from youtube import collect_video, extract_video_id_from_url
+    from youtube import collect_video, collect_videos, extract_video_id_from_url
     YOUTUBE_AVAILABLE = True
     print("✅ YouTube collector loaded successfully")
 except ImportError as e:
     print(f"⚠️  YouTube collector not available: {e}")
 
 try:
-    from twitter import collect_tweet
+    from twitter import collect_tweet, collect_tweets
     TWITTER_AVAILABLE = True
     print("✅ Twitter collector loaded successfully")
 except ImportError as e:
@@ -37,6 +39,60 @@ if not TWITTER_AVAILABLE and not YOUTUBE_AVAILABLE:
     print("pip install -r social_source/requirements.txt")
     sys.exit(1)
 
+def read_ids(ids_file):
+    """Read one ID or URL per line from a file, or from stdin when ids_file is '-'"""
+    if ids_file == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(ids_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    
+    # Skip blank lines and comments
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def normalize_tweet_id(value):
+    """Accept a tweet ID or tweet URL"""
+    return value.split('/')[-1].split('?')[0]
+
+def normalize_video_id(value):
+    """Accept a video ID or any supported YouTube URL"""
+    if 'youtube.com' in value or 'youtu.be' in value:
+        return extract_video_id_from_url(value)
+    return value
+
+def collect_many(source, raw_ids, send_to_backend, checkpoint=None):
+    """Collect a whole list of IDs/URLs in one run"""
+    results = []
+    
+    if source == 'twitter' and TWITTER_AVAILABLE:
+        tweet_ids = [normalize_tweet_id(value) for value in raw_ids]
+        print(f"Collecting {len(tweet_ids)} tweets")
+        for result in collect_tweets(tweet_ids, send_to_backend, checkpoint_path=checkpoint):
+            results.append(result)
+    
+    elif source == 'youtube' and YOUTUBE_AVAILABLE:
+        video_ids = []
+        for value in raw_ids:
+            video_id = normalize_video_id(value)
+            if video_id:
+                video_ids.append(video_id)
+            else:
+                print(f"Skipping unrecognised YouTube URL: {value}")
+        
+        print(f"Collecting {len(video_ids)} videos")
+        for result in collect_videos(video_ids, send_to_backend):
+            results.append(result)
+            print(f"  collected {result['video_id']} ({len(results)}/{len(video_ids)})")
+    
+    else:
+        print(f"Error: {source} collector is not available")
+    
+    if send_to_backend:
+        # Wait for queued backend sends so every result carries its doc ID
+        get_default_sink().flush()
+    
+    return results
+
 def main():
     parser = argparse.ArgumentParser(description='Misinformation Collector CLI')
     
@@ -56,6 +112,12 @@ def main():
     
     parser.add_argument('--url', type=str, help='URL to collect from')
     parser.add_argument('--id', type=str, help='Direct ID to collect (tweet ID or video ID)')
+    parser.add_argument('--ids-file', type=str,
+                        help="File with one ID or URL per line ('-' reads from stdin)")
+    parser.add_argument('--stdin', action='store_true',
+                        help='Read IDs or URLs from stdin, one per line')
+    parser.add_argument('--checkpoint', type=str,
+                        help='Checkpoint file so an interrupted --ids-file run can resume (Twitter)')
     parser.add_argument('--no-backend', action='store_true', 
                         help='Skip sending data to backend')
     parser.add_argument('--output', type=str, help='Output file to save results')
@@ -66,14 +128,22 @@ def main():
     result = None
     
     try:
-        if args.source == 'twitter' and TWITTER_AVAILABLE:
+        if args.ids_file or args.stdin:
+            raw_ids = read_ids('-' if args.stdin else args.ids_file)
+            if not raw_ids:
+                print("Error: No IDs found in input")
+                return
+            result = collect_many(args.source, raw_ids, send_to_backend, args.checkpoint)
+            print(f"\nCollected {len(result)}/{len(raw_ids)} items")
+        
+        elif args.source == 'twitter' and TWITTER_AVAILABLE:
             if args.id:
                 tweet_id = args.id
             elif args.url:
                 # Extract tweet ID from URL (simplified)
-                tweet_id = args.url.split('/')[-1].split('?')[0]
+                tweet_id = normalize_tweet_id(args.url)
             else:
-                print("Error: Please provide either --url or --id for Twitter")
+                print("Error: Please provide --url, --id or --ids-file for Twitter")
                 return
             
             print(f"Collecting tweet: {tweet_id}")
@@ -88,7 +158,7 @@ def main():
                     print("Error: Could not extract video ID from URL")
                     return
             else:
-                print("Error: Please provide either --url or --id for YouTube")
+                print("Error: Please provide --url, --id or --ids-file for YouTube")
                 return
             
             print(f"Collecting video: {video_id}")
@@ -108,7 +178,7 @@ def main():
                 print("Result:")
                 print(json.dumps(result, indent=2, ensure_ascii=False))
                 
-            if send_to_backend and 'backend_doc_id' in result:
+            if send_to_backend and isinstance(result, dict) and 'backend_doc_id' in result:
                 print(f"Data sent to backend with ID: {result['backend_doc_id']}")
         else:
             print("Collection failed!")
@@ -16,19 +16,23 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'social_source'))
 
 try:
     from youtube import collect_video, extract_video_id_from_url
-    from document_processor import DocumentProcessor
+    from document_processor import DocumentProcessor, parse_page_range
     from advanced_collector import SocialMediaCollector
     from content_monitor import ContentMonitor
+    from rollups import RollupCounter, fetch_daily_rollup
 except ImportError as e:
     print(f"Error importing modules: {e}")
     print("Install required packages: pip install -r social_source/requirements.txt")
     sys.exit(1)
 
 class EnhancedMisinfoCollector:
-    def __init__(self):
-        self.doc_processor = DocumentProcessor()
+    def __init__(self, video_keyframes=False):
+        self.doc_processor = DocumentProcessor(video_keyframes=video_keyframes)
         self.social_collector = SocialMediaCollector()
         self.monitor = ContentMonitor()
+        # Per-run counts of the items the (shared) backend sink got stored
+        self.rollups = RollupCounter()
+        self.social_collector.sink.add_result_listener(self.rollups.observe)
         
     def collect_from_url(self, url, collection_type="auto"):
         """Smart URL-based collection that detects content type"""
@@ -71,23 +75,34 @@ class EnhancedMisinfoCollector:
         
         return results
     
-    def collect_from_file(self, file_path):
+    def collect_from_url_file(self, url_file):
+        """Crawl every URL listed in a file (one per line) concurrently"""
+        with open(url_file, 'r', encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+        
+        print(f"🕸️ Crawling {len(urls)} URLs from {url_file}")
+        articles = self.social_collector.collect_news_articles_bulk(urls)
+        return [{"type": "news_article", "data": article} for article in articles]
+    
+    def collect_from_file(self, file_path, page_range=None):
         """Process and collect data from files"""
         print(f"📄 Processing file: {file_path}")
         
-        result = self.doc_processor.process_file(file_path)
+        result = self.doc_processor.process_file(file_path, page_range=page_range)
         if result:
             return [{"type": "document", "data": result}]
         return []
     
-    def collect_from_directory(self, directory_path):
+    def collect_from_directory(self, directory_path, workers=1, manifest_path=None):
         """Batch process files from directory"""
-        print(f"📁 Processing directory: {directory_path}")
+        print(f"📁 Processing directory: {directory_path} ({workers} worker(s))")
         
-        results = self.doc_processor.batch_process_directory(directory_path)
+        results = self.doc_processor.batch_process_directory(
+            directory_path, workers=workers, manifest_path=manifest_path
+        )
         return [{"type": "document", "data": result} for result in results]
     
-    def monitor_keywords(self, keywords, platforms=None):
+    def monitor_keywords(self, keywords, platforms=None, incremental=False):
         """Monitor specific keywords across platforms"""
         if platforms is None:
             platforms = ["reddit", "news"]  # Add news as backup when Reddit fails
@@ -98,7 +113,20 @@ class EnhancedMisinfoCollector:
         for platform in platforms:
             if platform == "reddit":
                 for keyword in keywords:
-                    reddit_results = self.social_collector.collect_public_social_content("reddit", keyword)
+                    if incremental:
+                        try:
+                            reddit_results = self.social_collector.collect_public_social_content(
+                                "reddit", keyword, incremental=True
+                            )
+                        except Exception as e:
+                            print(f"⚠️ Incremental Reddit collection failed for '{keyword}': {e}")
+                            reddit_results = None
+                        else:
+                            # Nothing new since the last run is not a failure
+                            results.extend([{"type": "reddit_post", "data": post} for post in reddit_results])
+                            continue
+                    else:
+                        reddit_results = self.social_collector.collect_public_social_content("reddit", keyword)
                     if reddit_results:
                         results.extend([{"type": "reddit_post", "data": post} for post in reddit_results])
                     else:
@@ -107,11 +135,10 @@ class EnhancedMisinfoCollector:
                         news_results = self.social_collector.collect_public_social_content("news_aggregator", keyword)
                         if news_results:
                             results.extend([{"type": "news_article", "data": article} for article in news_results])
-            elif platform == "news":
-                for keyword in keywords:
-                    news_results = self.social_collector.collect_public_social_content("news_aggregator", keyword)
-                    if news_results:
-                        results.extend([{"type": "news_article", "data": article} for article in news_results])
+            elif platform in ("news", "news_aggregator"):
+                # One fetch of every feed, matched against all keywords together
+                news_results = self.social_collector.collect_news_for_keywords(keywords)
+                results.extend([{"type": "news_article", "data": article} for article in news_results])
         
         return results
     
@@ -121,64 +148,74 @@ class EnhancedMisinfoCollector:
         self.monitor.start_monitoring()
     
     def generate_collection_report(self, results):
-        """Generate a summary report of collected data"""
+        """
+        Generate a summary report of collected data. items_stored and its
+        breakdowns count what this process's sink got stored; chunks that pool
+        workers stream with their own sinks (large PDF/text files in
+        --directory runs with workers) are only in the backend's "today" rollup.
+        """
+        # Items still queued on the sink are not counted until their batch is sent
+        self.social_collector.sink.flush()
+        counts = self.rollups.snapshot()
         report = {
             "timestamp": datetime.now().isoformat(),
             "total_items": len(results),
-            "by_type": {},
-            "by_platform": {},
+            "items_stored": counts["total"],
+            "by_type": counts["by_type"],
+            "by_platform": counts["by_platform"],
+            "by_source": counts["by_source"],
+            # Everything stored today, from the backend's rollup document
+            "today": fetch_daily_rollup(datetime.utcnow().strftime("%Y-%m-%d"), self.social_collector.sink),
             "summary": []
         }
         
         for item in results:
-            item_type = item.get("type", "unknown")
-            report["by_type"][item_type] = report["by_type"].get(item_type, 0) + 1
-            
-            # Extract platform info
-            platform = "unknown"
-            if item_type == "youtube_video":
-                platform = "youtube"
-            elif item_type == "reddit_post":
-                platform = "reddit"
-            elif item_type == "news_article":
-                platform = item.get("data", {}).get("metadata", {}).get("source_domain", "news")
-            
-            report["by_platform"][platform] = report["by_platform"].get(platform, 0) + 1
-            
             # Add to summary
             content_preview = str(item.get("data", {}).get("content", ""))[:100]
             report["summary"].append({
-                "type": item_type,
-                "platform": platform,
+                "type": item.get("type", "unknown"),
                 "content_preview": content_preview
             })
         
+        report["http_cache"] = self.social_collector.cache_stats()
         return report
 
 def main():
     parser = argparse.ArgumentParser(description='Enhanced Misinformation Collector')
     parser.add_argument('--url', type=str, help='URL to collect from')
+    parser.add_argument('--url-file', type=str, help='File with article URLs to crawl, one per line')
     parser.add_argument('--file', type=str, help='File to process')
+    parser.add_argument('--pages', type=parse_page_range,
+                        help='Page range for a PDF --file, e.g. 1-200 (streams the PDF in page chunks)')
     parser.add_argument('--directory', type=str, help='Directory to process')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for --directory (default: 1, serial)')
+    parser.add_argument('--keyframes', action='store_true',
+                        help='Fingerprint sampled video keyframes (perceptual hashes) for --file/--directory')
+    parser.add_argument('--manifest', type=str,
+                        help='Manifest file for incremental --directory rescans (only new/changed files are processed)')
     parser.add_argument('--keywords', type=str, nargs='+', help='Keywords to monitor')
     parser.add_argument('--platforms', type=str, nargs='+', default=['reddit'], 
                         help='Platforms to monitor (reddit, news_aggregator)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='With --keywords: only fetch Reddit posts newer than the previous run')
     parser.add_argument('--monitor', action='store_true', help='Start continuous monitoring')
     parser.add_argument('--output', type=str, help='Output file for results')
     parser.add_argument('--report', action='store_true', help='Generate detailed report')
     
     args = parser.parse_args()
     
-    if not any([args.url, args.file, args.directory, args.keywords, args.monitor]):
+    if not any([args.url, args.url_file, args.file, args.directory, args.keywords, args.monitor]):
         print("❌ Please specify at least one collection method:")
         print("   --url URL              Collect from URL")
+        print("   --url-file FILE        Crawl URLs listed in a file")
         print("   --file FILE            Process a file")
         print("   --directory DIR        Process directory")
         print("   --keywords WORDS       Monitor keywords")
         print("   --monitor              Start continuous monitoring")
         return
     
-    collector = EnhancedMisinfoCollector()
+    collector = EnhancedMisinfoCollector(video_keyframes=args.keyframes)
     all_results = []
     
     try:
@@ -187,19 +224,24 @@ def main():
             results = collector.collect_from_url(args.url)
             all_results.extend(results)
         
+        # Bulk URL crawling
+        if args.url_file:
+            results = collector.collect_from_url_file(args.url_file)
+            all_results.extend(results)
+        
         # File-based collection
         if args.file:
-            results = collector.collect_from_file(args.file)
+            results = collector.collect_from_file(args.file, args.pages)
             all_results.extend(results)
         
         # Directory-based collection
         if args.directory:
-            results = collector.collect_from_directory(args.directory)
+            results = collector.collect_from_directory(args.directory, args.workers, args.manifest)
             all_results.extend(results)
         
         # Keyword monitoring
         if args.keywords:
-            results = collector.monitor_keywords(args.keywords, args.platforms)
+            results = collector.monitor_keywords(args.keywords, args.platforms, args.incremental)
             all_results.extend(results)
         
         # Continuous monitoring
@@ -4,11 +4,17 @@ Supports multiple platforms with specialized extraction methods
 """
 
 import os
+import asyncio
 import requests
 import json
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
+from backend_sink import get_default_sink
+from feed_engine import FeedEngine
+from html_extraction import extract_article_fast
+from http_cache import install_cache
+from watermarks import WatermarkStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,10 +22,114 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-API_BASE_URL = os.getenv("API_BASE_URL", "https://misinformation-collector-322893934340.asia-south1.run.app")
+ARTICLE_TIMEOUT = 20
+# On-disk HTTP response cache for the collector session; set HTTP_CACHE_DIR="" to disable
+HTTP_CACHE_DIR = os.path.expanduser(os.getenv("HTTP_CACHE_DIR", "~/.cache/misinfo-collector/http"))
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "512"))
+# Incremental Reddit collection: newest post seen per keyword, kept across runs
+REDDIT_WATERMARK_FILE = os.path.expanduser(
+    os.getenv("REDDIT_WATERMARK_FILE", "~/.cache/misinfo-collector/reddit_watermarks.json")
+)
+REDDIT_PAGE_SIZE = 100
+# Upper bound on pages per keyword and cycle (the first cycle for a keyword reads one page)
+REDDIT_MAX_PAGES = int(os.getenv("REDDIT_MAX_PAGES", "10"))
+REDDIT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/javascript, */*; q=0.01',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.reddit.com/',
+    'X-Requested-With': 'XMLHttpRequest'
+}
+
+def extract_article(html, url):
+    """
+    Extract title, body, author and date from an article page.
+    Module-level so the crawler can run it in a worker process.
+    """
+    try:
+        return extract_article_fast(html, url)
+    except Exception as e:
+        logger.warning(f"Fast extraction failed for {url}, falling back to html.parser: {e}")
+        return extract_article_bs4(html, url)
+
+def extract_article_bs4(html, url):
+    """Original BeautifulSoup/html.parser extraction, kept as the fallback path"""
+    # This is a simplified example - you'd want to use proper HTML parsing
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Extract article content
+    article_data = {
+        "type": "news_article",
+        "content": "",
+        "metadata": {
+            "url": url,
+            "title": "",
+            "author": "",
+            "publication_date": "",
+            "source_domain": url.split('/')[2] if '/' in url else "",
+            "timestamp": datetime.now().isoformat()
+        }
+    }
+    
+    # Try different selectors for title
+    title_selectors = ['h1', '.headline', '.article-title', '[data-testid="headline"]']
+    for selector in title_selectors:
+        title_element = soup.select_one(selector)
+        if title_element:
+            article_data["metadata"]["title"] = title_element.get_text().strip()
+            break
+    
+    # Try different selectors for article content
+    content_selectors = ['article', '.article-content', '.post-content', '.entry-content', 'main']
+    for selector in content_selectors:
+        content_element = soup.select_one(selector)
+        if content_element:
+            article_data["content"] = content_element.get_text().strip()
+            break
+    
+    # Extract author
+    author_selectors = ['.author', '.byline', '[rel="author"]', '.article-author']
+    for selector in author_selectors:
+        author_element = soup.select_one(selector)
+        if author_element:
+            article_data["metadata"]["author"] = author_element.get_text().strip()
+            break
+    
+    # Extract publication date
+    date_selectors = ['time', '.date', '.publish-date', '[datetime]']
+    for selector in date_selectors:
+        date_element = soup.select_one(selector)
+        if date_element:
+            article_data["metadata"]["publication_date"] = (
+                date_element.get('datetime') or date_element.get_text().strip()
+            )
+            break
+    
+    return article_data
+
+def _reddit_post_record(post_data):
+    """Convert a post from a Reddit listing into our record"""
+    return {
+        "type": "reddit_post",
+        "content": f"{post_data.get('title', '')} {post_data.get('selftext', '')}",
+        "metadata": {
+            "platform": "reddit",
+            "post_id": post_data.get('id'),
+            "subreddit": post_data.get('subreddit'),
+            "author": post_data.get('author'),
+            "score": post_data.get('score'),
+            "num_comments": post_data.get('num_comments'),
+            "created_utc": post_data.get('created_utc'),
+            "url": f"https://reddit.com{post_data.get('permalink', '')}",
+            "timestamp": datetime.now().isoformat()
+        }
+    }
 
 class SocialMediaCollector:
-    def __init__(self):
+    def __init__(self, sink=None, cache_dir=HTTP_CACHE_DIR, watermark_file=REDDIT_WATERMARK_FILE):
+        self.sink = sink or get_default_sink()
+        self.reddit_watermarks = WatermarkStore(watermark_file)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -30,102 +140,75 @@ class SocialMediaCollector:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
+        self.http_cache = None
+        if cache_dir:
+            self.http_cache = install_cache(self.session, cache_dir, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024)
+        self.feed_engine = FeedEngine(self.session)
+
+    def cache_stats(self):
+        """Hit/miss/revalidation/eviction counters of the HTTP response cache"""
+        if not self.http_cache:
+            return {}
+        return dict(self.http_cache.stats, entries=len(self.http_cache.cache),
+                    bytes=self.http_cache.cache.total_bytes)
 
     def send_to_backend(self, data, source_type="social_scraper"):
-        """Send collected data to backend"""
-        try:
-            payload = {
-                "source": source_type,
-                "type": data.get("type", "social_post"),
-                "content_text": data.get("content", ""),
-                "metadata": json.dumps(data.get("metadata", {}))
-            }
-            
-            response = requests.post(f"{API_BASE_URL}/collect", data=payload, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Data sent to backend successfully: {result.get('doc_id')}")
-                return result
-            else:
-                logger.error(f"Failed to send to backend: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error sending to backend: {e}")
-            return None
+        """Queue collected data for the backend; returns a Future of the result"""
+        return self.sink.submit(
+            source_type,
+            data.get("type", "social_post"),
+            data.get("content", ""),
+            data.get("metadata", {})
+        )
 
     def collect_news_articles(self, url):
         """Collect news article content"""
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, timeout=ARTICLE_TIMEOUT)
             response.raise_for_status()
             
-            # This is a simplified example - you'd want to use proper HTML parsing
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract article content
-            article_data = {
-                "type": "news_article",
-                "content": "",
-                "metadata": {
-                    "url": url,
-                    "title": "",
-                    "author": "",
-                    "publication_date": "",
-                    "source_domain": url.split('/')[2] if '/' in url else "",
-                    "timestamp": datetime.now().isoformat()
-                }
-            }
-            
-            # Try different selectors for title
-            title_selectors = ['h1', '.headline', '.article-title', '[data-testid="headline"]']
-            for selector in title_selectors:
-                title_element = soup.select_one(selector)
-                if title_element:
-                    article_data["metadata"]["title"] = title_element.get_text().strip()
-                    break
-            
-            # Try different selectors for article content
-            content_selectors = ['article', '.article-content', '.post-content', '.entry-content', 'main']
-            for selector in content_selectors:
-                content_element = soup.select_one(selector)
-                if content_element:
-                    article_data["content"] = content_element.get_text().strip()
-                    break
-            
-            # Extract author
-            author_selectors = ['.author', '.byline', '[rel="author"]', '.article-author']
-            for selector in author_selectors:
-                author_element = soup.select_one(selector)
-                if author_element:
-                    article_data["metadata"]["author"] = author_element.get_text().strip()
-                    break
-            
-            # Extract publication date
-            date_selectors = ['time', '.date', '.publish-date', '[datetime]']
-            for selector in date_selectors:
-                date_element = soup.select_one(selector)
-                if date_element:
-                    article_data["metadata"]["publication_date"] = (
-                        date_element.get('datetime') or date_element.get_text().strip()
-                    )
-                    break
-            
-            return article_data
+            return extract_article(response.content, url)
             
         except Exception as e:
             logger.error(f"Error collecting news article: {e}")
             return None
 
-    def collect_public_social_content(self, platform, search_terms=None):
+    def collect_news_articles_bulk(self, urls, send_to_backend=True, **crawler_options):
+        """
+        Crawl many article URLs concurrently with the async crawler.
+        crawler_options are passed to ArticleCrawler (per_domain_limit,
+        global_limit, timeout, extract_workers, respect_robots).
+        """
+        from article_crawler import ArticleCrawler
+        
+        crawler = ArticleCrawler(user_agent=self.session.headers['User-Agent'], **crawler_options)
+        articles = []
+        
+        async def crawl():
+            # Each article goes to the sink as soon as it is extracted
+            async for url, article in crawler.crawl(urls):
+                if not article:
+                    continue
+                articles.append(article)
+                if send_to_backend:
+                    self.send_to_backend(article, "news_crawler")
+        
+        asyncio.run(crawl())
+        
+        logger.info(f"Crawled {len(articles)}/{len(urls)} articles")
+        return articles
+
+    def collect_public_social_content(self, platform, search_terms=None, incremental=False):
         """
         Collect publicly available social media content
         Note: This is a template - actual implementation would depend on platform APIs
+        incremental: only fetch Reddit posts newer than the previous run's (see
+        _collect_reddit_incremental)
         """
         
         if platform.lower() == "reddit":
+            if incremental:
+                return self._collect_reddit_incremental(search_terms)
             return self._collect_reddit_content(search_terms)
         elif platform.lower() == "news_aggregator":
             return self._collect_news_aggregator_content(search_terms)
@@ -142,15 +225,7 @@ class SocialMediaCollector:
             reddit_url = f"https://www.reddit.com/search.json?q={search_terms}&sort=relevance&limit=25"
             
             # Add additional headers to appear more like a regular browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/json, text/javascript, */*; q=0.01',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Referer': 'https://www.reddit.com/',
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-            
-            response = self.session.get(reddit_url, headers=headers, timeout=10)
+            response = self.session.get(reddit_url, headers=REDDIT_HEADERS, timeout=10)
             
             # If JSON API fails, try alternative method
             if response.status_code == 403:
@@ -162,24 +237,7 @@ class SocialMediaCollector:
             posts = []
             
             for post in data.get('data', {}).get('children', []):
-                post_data = post.get('data', {})
-                
-                reddit_post = {
-                    "type": "reddit_post",
-                    "content": f"{post_data.get('title', '')} {post_data.get('selftext', '')}",
-                    "metadata": {
-                        "platform": "reddit",
-                        "post_id": post_data.get('id'),
-                        "subreddit": post_data.get('subreddit'),
-                        "author": post_data.get('author'),
-                        "score": post_data.get('score'),
-                        "num_comments": post_data.get('num_comments'),
-                        "created_utc": post_data.get('created_utc'),
-                        "url": f"https://reddit.com{post_data.get('permalink', '')}",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                }
-                
+                reddit_post = _reddit_post_record(post.get('data', {}))
                 posts.append(reddit_post)
                 
                 # Send to backend
@@ -192,6 +250,60 @@ class SocialMediaCollector:
             logger.error(f"Error collecting Reddit content: {e}")
             return self._collect_reddit_alternative(search_terms)
 
+    def _collect_reddit_incremental(self, search_terms):
+        """
+        Collect only Reddit posts newer than the keyword's stored watermark:
+        newest-first search pages are followed through the `after` cursor until
+        a post at or below the watermark appears. Errors are raised rather than
+        replaced with sample data, and leave the watermark unchanged; it only
+        advances after the backend has confirmed every new post.
+        """
+        watermark = self.reddit_watermarks.get(search_terms)
+        max_pages = REDDIT_MAX_PAGES if watermark else 1
+        posts = []
+        newest = None
+        after = None
+        reached_watermark = False
+        
+        for page in range(max_pages):
+            params = {"q": search_terms, "sort": "new", "limit": REDDIT_PAGE_SIZE, "raw_json": 1}
+            if after:
+                params["after"] = after
+            response = self.session.get("https://www.reddit.com/search.json", params=params,
+                                        headers=REDDIT_HEADERS, timeout=10)
+            response.raise_for_status()
+            listing = response.json().get('data', {})
+            
+            for child in listing.get('children', []):
+                post_data = child.get('data', {})
+                created = post_data.get('created_utc') or 0
+                if watermark and (post_data.get('id') == watermark["post_id"] or created < watermark["created_utc"]):
+                    reached_watermark = True
+                    break
+                if newest is None:
+                    newest = {"post_id": post_data.get('id'), "created_utc": created}
+                posts.append(_reddit_post_record(post_data))
+            
+            after = listing.get('after')
+            if reached_watermark or not after:
+                break
+        
+        if watermark and not reached_watermark and after:
+            logger.warning(f"Reddit '{search_terms}': more than {max_pages} pages of new posts, older ones skipped")
+        
+        futures = [self.send_to_backend(post, "reddit_scraper") for post in posts]
+        if newest:
+            # Only advance once the backend has every post; otherwise the next run fetches them again
+            self.sink.flush()
+            failed = sum(1 for future in futures if future.result() is None)
+            if failed:
+                raise RuntimeError(f"Reddit '{search_terms}': {failed} of {len(posts)} posts were not stored; "
+                                   "watermark left unchanged")
+            self.reddit_watermarks.set(search_terms, newest)
+        
+        logger.info(f"Reddit '{search_terms}': {len(posts)} new posts in {page + 1} request(s)")
+        return posts
+
     def _collect_reddit_alternative(self, search_terms):
         """Alternative method for Reddit data collection when API is blocked"""
         try:
@@ -236,75 +348,67 @@ class SocialMediaCollector:
     def _collect_news_aggregator_content(self, search_terms):
         """Collect news articles from various sources"""
         try:
-            logger.info(f"Collecting news articles for '{search_terms}'...")
-            
-            # Method 1: Use RSS feeds from major news sources
-            news_sources = [
-                {"name": "BBC", "rss": "http://feeds.bbci.co.uk/news/rss.xml"},
-                {"name": "Reuters", "rss": "http://feeds.reuters.com/reuters/topNews"},
-                {"name": "AP News", "rss": "https://rsshub.app/apnews/topics/apf-topnews"},
-                {"name": "NPR", "rss": "https://feeds.npr.org/1001/rss.xml"}
-            ]
-            
-            articles = []
-            for source in news_sources:
-                try:
-                    import feedparser
-                    feed = feedparser.parse(source["rss"])
-                    
-                    for entry in feed.entries[:3]:  # Limit to 3 articles per source
-                        # Check if search terms are in title or summary
-                        content = f"{entry.get('title', '')} {entry.get('summary', '')}"
-                        if any(term.lower() in content.lower() for term in search_terms.split()):
-                            article = {
-                                "type": "news_article",
-                                "content": content,
-                                "metadata": {
-                                    "platform": "news",
-                                    "source": source["name"],
-                                    "title": entry.get('title', ''),
-                                    "link": entry.get('link', ''),
-                                    "published": entry.get('published', ''),
-                                    "timestamp": datetime.now().isoformat(),
-                                    "search_term": search_terms
-                                }
-                            }
-                            articles.append(article)
-                            
-                            # Send to backend
-                            self.send_to_backend(article, "news_aggregator")
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to fetch from {source['name']}: {e}")
-                    continue
-            
-            # Method 2: If no RSS results, create a sample/demo entry
-            if not articles:
-                logger.info("No RSS articles found, creating demo entry...")
-                demo_article = {
-                    "type": "news_article", 
-                    "content": f"Demo news article about {search_terms} - This is a sample entry for testing purposes.",
-                    "metadata": {
-                        "platform": "news",
-                        "source": "Demo Source",
-                        "title": f"Sample News Article: {search_terms}",
-                        "link": "https://example.com/demo-article",
-                        "published": datetime.now().isoformat(),
-                        "timestamp": datetime.now().isoformat(),
-                        "search_term": search_terms,
-                        "note": "Demo data - RSS feeds may be blocked or unavailable"
-                    }
-                }
-                articles.append(demo_article)
-                self.send_to_backend(demo_article, "news_aggregator_demo")
-            
-            logger.info(f"Collected {len(articles)} news articles")
-            return articles
-            
+            return self.collect_news_for_keywords([search_terms])
         except Exception as e:
             logger.error(f"Error collecting news articles: {e}")
             return None
 
+    def collect_news_for_keywords(self, keywords, matcher=None, demo_fallback=True):
+        """
+        Collect news articles for many keywords at once. Each feed is fetched
+        at most once per cycle and every keyword is matched in the same pass.
+        """
+        logger.info(f"Collecting news articles for {len(keywords)} keyword(s)...")
+        
+        # Method 1: Use RSS feeds from major news sources
+        articles = []
+        matched_keywords = set()
+        for source, entry, content, matched in self.feed_engine.match(keywords, matcher=matcher):
+            article = {
+                "type": "news_article",
+                "content": content,
+                "metadata": {
+                    "platform": "news",
+                    "source": source["name"],
+                    "title": entry.get('title', ''),
+                    "link": entry.get('link', ''),
+                    "published": entry.get('published', ''),
+                    "timestamp": datetime.now().isoformat(),
+                    "search_term": matched[0],
+                    "matched_keywords": matched
+                }
+            }
+            articles.append(article)
+            matched_keywords.update(matched)
+            
+            # Send to backend
+            self.send_to_backend(article, "news_aggregator")
+        
+        # Method 2: If no RSS results for a keyword, create a sample/demo entry
+        for search_terms in keywords:
+            if not demo_fallback or search_terms in matched_keywords:
+                continue
+            logger.info(f"No RSS articles found for '{search_terms}', creating demo entry...")
+            demo_article = {
+                "type": "news_article", 
+                "content": f"Demo news article about {search_terms} - This is a sample entry for testing purposes.",
+                "metadata": {
+                    "platform": "news",
+                    "source": "Demo Source",
+                    "title": f"Sample News Article: {search_terms}",
+                    "link": "https://example.com/demo-article",
+                    "published": datetime.now().isoformat(),
+                    "timestamp": datetime.now().isoformat(),
+                    "search_term": search_terms,
+                    "note": "Demo data - RSS feeds may be blocked or unavailable"
+                }
+            }
+            articles.append(demo_article)
+            self.send_to_backend(demo_article, "news_aggregator_demo")
+        
+        logger.info(f"Collected {len(articles)} news articles")
+        return articles
+
 def main():
     """Example usage of the Social Media Collector"""
     collector = SocialMediaCollector()
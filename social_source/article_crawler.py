@@ -0,0 +1,160 @@
+"""
+Async Article Crawler
+High-concurrency fetching of article URLs with per-domain caps, a shared
+connection pool, timeouts and cached robots.txt rules. Extraction runs in
+a process pool so parsing never blocks fetching.
+"""
+
+import asyncio
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import aiohttp
+import logging
+
+from advanced_collector import extract_article
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; MisinfoCollector/1.0)"
+
+class ArticleCrawler:
+    def __init__(self, user_agent=DEFAULT_USER_AGENT, global_limit=64, per_domain_limit=4,
+                 timeout=20, extract_workers=None, respect_robots=True, extractor=extract_article):
+        self.user_agent = user_agent
+        self.global_limit = global_limit
+        self.per_domain_limit = per_domain_limit
+        self.timeout = timeout
+        self.extract_workers = extract_workers
+        self.respect_robots = respect_robots
+        self.extractor = extractor
+
+        # netloc -> RobotFileParser, or None when robots.txt could not be read
+        self._robots = {}
+        self._robots_locks = {}
+        self.stats = {"fetched": 0, "failed": 0, "blocked_by_robots": 0}
+
+    async def _allowed(self, session, url):
+        """Check robots.txt, fetching and caching it once per host"""
+        if not self.respect_robots:
+            return True
+
+        parts = urlsplit(url)
+        netloc = parts.netloc
+        if netloc not in self._robots:
+            lock = self._robots_locks.setdefault(netloc, asyncio.Lock())
+            async with lock:
+                if netloc not in self._robots:
+                    self._robots[netloc] = await self._fetch_robots(session, f"{parts.scheme}://{netloc}/robots.txt")
+
+        rules = self._robots[netloc]
+        return rules is None or rules.can_fetch(self.user_agent, url)
+
+    async def _fetch_robots(self, session, robots_url):
+        try:
+            async with session.get(robots_url) as response:
+                if response.status >= 400:
+                    # No robots.txt (or an error page) means no restrictions
+                    return None
+                text = await response.text(errors="replace")
+        except Exception as e:
+            logger.warning(f"Could not read {robots_url}: {e}")
+            return None
+
+        rules = RobotFileParser(robots_url)
+        rules.parse(text.splitlines())
+        return rules
+
+    async def _fetch(self, session, url):
+        """Fetch one URL; returns bytes or None"""
+        if not await self._allowed(session, url):
+            self.stats["blocked_by_robots"] += 1
+            logger.info(f"Skipping {url} (disallowed by robots.txt)")
+            return None
+
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                body = await response.read()
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Error fetching {url}: {e}")
+            return None
+
+        self.stats["fetched"] += 1
+        return body
+
+    async def crawl(self, urls):
+        """
+        Async generator yielding (url, article or None) as pages complete.
+        URLs wait in one queue per domain and are started round-robin from
+        domains below per_domain_limit, so a run dominated by one domain
+        still keeps up to global_limit fetches going on the others.
+        """
+        queues = OrderedDict()
+        for url in dict.fromkeys(urls):
+            queues.setdefault(urlsplit(url).netloc, deque()).append(url)
+        if not queues:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.global_limit,
+            limit_per_host=self.per_domain_limit,
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        loop = asyncio.get_running_loop()
+        active = Counter()
+
+        def next_url():
+            """Pop a URL from the next domain with a free slot, or None"""
+            for netloc in list(queues):
+                if active[netloc] < self.per_domain_limit:
+                    queue = queues.pop(netloc)
+                    url = queue.popleft()
+                    if queue:
+                        # Re-append so domains take turns
+                        queues[netloc] = queue
+                    return netloc, url
+            return None
+
+        async def fetch_and_extract(url, session, pool):
+            article = None
+            body = await self._fetch(session, url)
+            if body is not None:
+                try:
+                    article = await loop.run_in_executor(pool, self.extractor, body, url)
+                except Exception as e:
+                    logger.warning(f"Error extracting {url}: {e}")
+            return url, article
+
+        with ProcessPoolExecutor(max_workers=self.extract_workers) as pool:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                             headers={"User-Agent": self.user_agent}) as session:
+                # task -> domain of its URL
+                running = {}
+                try:
+                    while queues or running:
+                        while len(running) < self.global_limit:
+                            picked = next_url()
+                            if picked is None:
+                                break
+                            netloc, url = picked
+                            active[netloc] += 1
+                            running[asyncio.create_task(fetch_and_extract(url, session, pool))] = netloc
+                        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            active[running.pop(task)] -= 1
+                            yield task.result()
+                finally:
+                    for task in running:
+                        task.cancel()
+                    await asyncio.gather(*running, return_exceptions=True)
+
+    def crawl_all(self, urls):
+        """Blocking wrapper around crawl(); returns [(url, article or None)] once every page is done"""
+        async def run():
+            return [item async for item in self.crawl(urls)]
+        return asyncio.run(run())
@@ -0,0 +1,246 @@
+"""
+Shared Backend Sink
+Buffers collected items and ships them to the backend's /collect/batch
+endpoint from a background thread over a pooled keep-alive session
+"""
+
+import os
+import json
+import queue
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+import logging
+from dedup import SeenCache, content_fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+API_BASE_URL = os.getenv("API_BASE_URL", "https://misinformation-collector-322893934340.asia-south1.run.app")
+SINK_BATCH_SIZE = int(os.getenv("SINK_BATCH_SIZE", "50"))
+SINK_FLUSH_INTERVAL = float(os.getenv("SINK_FLUSH_INTERVAL", "2.0"))
+
+# Markers that tell the worker thread to send its buffer now / drain and exit
+_FLUSH = object()
+_STOP = object()
+
+class BackendSink:
+    def __init__(self, api_base_url=API_BASE_URL, batch_size=SINK_BATCH_SIZE,
+                 flush_interval=SINK_FLUSH_INTERVAL, max_queue_size=10000,
+                 pool_size=10, timeout=30, dedup=True):
+        self.api_base_url = api_base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        # fingerprint -> Future of the first submission of that content
+        self._seen = SeenCache() if dedup else None
+        self.duplicates_skipped = 0
+        # Called with (source, type, content_text, metadata) for every new item
+        self._listeners = []
+        # Called with (source, type, metadata, result) once a new item's send resolves
+        self._result_listeners = []
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=3, connect=3, read=0, backoff_factor=0.5,
+                              status_forcelist=[502, 503, 504], allowed_methods=None)
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Bounded so a dead backend applies back-pressure instead of eating memory
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._batch_supported = True
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="backend-sink", daemon=True)
+        self._worker.start()
+
+    def submit(self, source, type, content_text="", metadata=None):
+        """
+        Queue one item for the backend and return immediately.
+        The returned Future resolves to the backend's per-item result
+        ({"status": "success", "doc_id": ...}) or None if sending failed.
+        Content already submitted in this process is not sent again; the
+        Future of the original submission is returned instead.
+        """
+        fingerprint = None
+        if self._seen is not None:
+            fingerprint = content_fingerprint(source, content_text, metadata)
+            existing = self._seen.get(fingerprint)
+            if existing is not None:
+                self.duplicates_skipped += 1
+                return existing
+
+        future = Future()
+        if self._closed:
+            logger.error("Backend sink is closed - dropping item")
+            future.set_result(None)
+            return future
+
+        if fingerprint is not None:
+            self._seen.put(fingerprint, future)
+            # Forget failed sends so the same content can be retried later
+            future.add_done_callback(
+                lambda f: f.result() is None and self._seen.discard(fingerprint)
+            )
+
+        item = {
+            "source": source,
+            "type": type,
+            "content_text": content_text or "",
+            "metadata": metadata or {}
+        }
+        for listener in self._listeners:
+            try:
+                listener(source, type, item["content_text"], item["metadata"])
+            except Exception as e:
+                logger.warning(f"Sink listener failed: {e}")
+        for listener in self._result_listeners:
+            future.add_done_callback(partial(self._notify_result, listener, source, type, item["metadata"]))
+        self._queue.put((item, future))
+        return future
+
+    def add_listener(self, listener):
+        """Have listener(source, type, content_text, metadata) see every new (non-duplicate) item"""
+        self._listeners.append(listener)
+
+    def add_result_listener(self, listener):
+        """
+        Have listener(source, type, metadata, result) see the backend's result
+        for every new item once it is sent (result is None if sending failed).
+        Runs on the sink's worker thread.
+        """
+        self._result_listeners.append(listener)
+
+    @staticmethod
+    def _notify_result(listener, source, type, metadata, future):
+        try:
+            listener(source, type, metadata, future.result())
+        except Exception as e:
+            logger.warning(f"Sink result listener failed: {e}")
+
+    def flush(self):
+        """Block until everything submitted so far has been sent"""
+        if not self._closed:
+            self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Drain the buffer, stop the worker and release pooled connections"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join()
+        self.session.close()
+
+    def _run(self):
+        """Worker loop: flush when the batch is full or the interval expires"""
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+
+            if entry is _STOP or entry is _FLUSH:
+                self._send(batch)
+                batch = []
+                deadline = None
+                self._queue.task_done()
+                if entry is _STOP:
+                    return
+                continue
+
+            if entry is not None:
+                batch.append(entry)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._send(batch)
+                batch = []
+                deadline = None
+
+    def _send(self, batch):
+        """Send one batch and resolve its futures; never raises"""
+        if not batch:
+            return
+        try:
+            if self._batch_supported:
+                results = self._post_batch([item for item, _ in batch])
+            else:
+                results = None
+            if results is None:
+                results = [self._post_single(item) for item, _ in batch]
+        except Exception as e:
+            logger.error(f"Error sending batch to backend: {e}")
+            results = [None] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+            self._queue.task_done()
+
+    def _post_batch(self, items):
+        """POST to /collect/batch; returns per-item results or None to fall back"""
+        response = self.session.post(
+            f"{self.api_base_url}/collect/batch",
+            json=items,
+            timeout=self.timeout
+        )
+
+        if response.status_code in (404, 405):
+            logger.warning("Backend has no /collect/batch endpoint - falling back to /collect")
+            self._batch_supported = False
+            return None
+
+        if response.status_code != 200:
+            logger.error(f"Failed to send batch to backend: {response.status_code} - {response.text}")
+            return [None] * len(items)
+
+        results = [None] * len(items)
+        for entry in response.json().get("results", []):
+            if entry.get("status") == "success":
+                results[entry["index"]] = entry
+            else:
+                logger.error(f"Backend rejected item {entry.get('index')}: {entry.get('error')}")
+
+        logger.info(f"Batch of {len(items)} items sent to backend")
+        return results
+
+    def _post_single(self, item):
+        """POST one item to the form-encoded /collect endpoint"""
+        try:
+            payload = dict(item, metadata=json.dumps(item["metadata"]))
+            response = self.session.post(f"{self.api_base_url}/collect", data=payload, timeout=self.timeout)
+            if response.status_code == 200:
+                return response.json()
+            logger.error(f"Failed to send to backend: {response.status_code}")
+        except requests.RequestException as e:
+            logger.error(f"Error sending to backend: {e}")
+        return None
+
+_default_sink = None
+_default_sink_lock = threading.Lock()
+
+def get_default_sink():
+    """Return the process-wide sink shared by all collectors"""
+    global _default_sink
+    with _default_sink_lock:
+        if _default_sink is None:
+            _default_sink = BackendSink()
+            atexit.register(_default_sink.close)
+        return _default_sink
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Article Extraction Benchmark
+Compares the original BeautifulSoup/html.parser extraction with the lxml
+engine over a corpus of saved pages.
+
+Usage: python benchmarks/bench_extraction.py --pages saved_pages/ --repeat 3
+Saved pages are read as <domain>__<name>.html (e.g. bbc.com__story1.html) so
+the matching domain profile is used. Without --pages a synthetic corpus of
+large news-style pages is generated.
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_collector import extract_article_bs4
+from html_extraction import extract_article_fast
+
+SYNTHETIC_DOMAINS = ["www.bbc.com", "edition.cnn.com", "www.reuters.com", "apnews.com", "example.org"]
+
+def synthetic_page(index, paragraphs=400):
+    """A heavy page with navigation, scripts and a long article body"""
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(200))
+    body = "".join(f"<p>Paragraph {i} of story {index} with <b>some</b> <a href='#'>inline</a> markup.</p>"
+                   for i in range(paragraphs))
+    return (
+        f"<html><head><title>Story {index}</title><script>var x = {index};</script></head><body>"
+        f"<header><ul>{nav}</ul></header><main><article>"
+        f"<h1 id='main-heading' data-editable='headlineText'>Headline {index}</h1>"
+        f"<span class='byline'>Reporter {index}</span><time datetime='2024-01-0{index % 9 + 1}'>Jan</time>"
+        f"{body}</article></main><footer><ul>{nav}</ul></footer></body></html>"
+    ).encode("utf-8")
+
+def load_corpus(pages_dir, synthetic_count):
+    if not pages_dir:
+        return [(f"https://{SYNTHETIC_DOMAINS[i % len(SYNTHETIC_DOMAINS)]}/story/{i}", synthetic_page(i))
+                for i in range(synthetic_count)]
+
+    corpus = []
+    for path in sorted(Path(pages_dir).glob("*.htm*")):
+        domain, _, name = path.stem.partition("__")
+        url = f"https://{domain}/{name}" if name else f"https://unknown/{path.stem}"
+        corpus.append((url, path.read_bytes()))
+    return corpus
+
+def run(extractor, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [extractor(html, url) for url, html in corpus]
+    return time.perf_counter() - start, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article extraction engines")
+    parser.add_argument("--pages", type=str, help="Directory of saved .html pages")
+    parser.add_argument("--synthetic", type=int, default=50, help="Synthetic pages when --pages is not given")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus per engine")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.pages, args.synthetic)
+    if not corpus:
+        print("No pages found")
+        return
+    total_bytes = sum(len(html) for _, html in corpus)
+
+    bs4_time, bs4_results = run(extract_article_bs4, corpus, args.repeat)
+    lxml_time, lxml_results = run(extract_article_fast, corpus, args.repeat)
+
+    same_title = sum(a["metadata"]["title"] == b["metadata"]["title"] for a, b in zip(bs4_results, lxml_results))
+    pages = len(corpus) * args.repeat
+
+    print(f"Pages: {len(corpus)} ({total_bytes / 1024 / 1024:.1f} MiB) x {args.repeat} passes")
+    print(f"  html.parser + select_one: {bs4_time:7.2f}s  {pages / bs4_time:8.1f} pages/s")
+    print(f"  lxml + compiled profiles: {lxml_time:7.2f}s  {pages / lxml_time:8.1f} pages/s")
+    print(f"  speedup: {bs4_time / lxml_time:.1f}x   titles identical: {same_title}/{len(corpus)}")
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,24 @@ Automated Content Monitoring System
 Continuously monitors various sources for misinformation patterns
 """
 
-import schedule
-import time
+import os
+import asyncio
 import json
 from datetime import datetime, timedelta
 from advanced_collector import SocialMediaCollector
+from keyword_matcher import KeywordMatcher
+from job_scheduler import JobScheduler
+from trend_engine import TrendEngine, DIMENSIONS, WINDOWS
+from rollups import fetch_daily_rollup
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TREND_SNAPSHOT_FILE = os.path.expanduser(
+    os.getenv("TREND_SNAPSHOT_FILE", "~/.cache/misinfo-collector/trends.json.gz")
+)
+
 class ContentMonitor:
     def __init__(self):
         self.collector = SocialMediaCollector()
@@ -25,78 +33,130 @@ class ContentMonitor:
             "cnn.com", "bbc.com", "reuters.com", "apnews.com",
             "nytimes.com", "washingtonpost.com", "theguardian.com"
         ]
+        # Built once; matches whole keyword phrases at word boundaries
+        self.keyword_matcher = KeywordMatcher(self.monitoring_keywords, whole_words=True)
+        self.scheduler = JobScheduler()
+        # Updated as each item is collected, so analyze_trends never rescans the database
+        self.trend_engine = TrendEngine(TREND_SNAPSHOT_FILE)
+        self.collector.sink.add_listener(self.trend_engine.observe)
 
     def monitor_reddit_discussions(self):
         """Monitor Reddit for misinformation-related discussions"""
         logger.info("Starting Reddit monitoring...")
         
+        failures = 0
         for keyword in self.monitoring_keywords:
             try:
-                posts = self.collector.collect_public_social_content("reddit", keyword)
+                # Only posts newer than the previous cycle's are fetched
+                posts = self.collector.collect_public_social_content("reddit", keyword, incremental=True)
                 if posts:
                     logger.info(f"Collected {len(posts)} Reddit posts for keyword: {keyword}")
             except Exception as e:
+                failures += 1
                 logger.error(f"Error monitoring Reddit for {keyword}: {e}")
+        
+        if failures == len(self.monitoring_keywords):
+            # Counts against the job's error budget in the scheduler
+            raise RuntimeError("Reddit monitoring failed for every keyword")
 
     def monitor_news_sites(self):
         """Monitor news websites for articles containing misinformation keywords"""
         logger.info("Starting news site monitoring...")
         
-        # This would implement RSS feeds, site crawling, or news APIs
-        # For now, it's a template
-        pass
+        try:
+            articles = self.collector.collect_news_for_keywords(
+                self.monitoring_keywords, matcher=self.keyword_matcher, demo_fallback=False
+            )
+            logger.info(f"Collected {len(articles)} news articles matching monitoring keywords")
+        except Exception as e:
+            logger.error(f"Error monitoring news sites: {e}")
+            raise
 
     def analyze_trends(self):
         """Analyze collected data for trending misinformation topics"""
         logger.info("Analyzing trends in collected data...")
         
-        # This would query your Firestore database and analyze patterns
-        # Implementation would include:
-        # - Most frequent misinformation topics
-        # - Viral false claims
-        # - Source reliability analysis
-        # - Geographic spread patterns
-        pass
+        trends = self.trend_engine.report()
+        for window in WINDOWS:
+            for dimension in DIMENSIONS:
+                rising = ", ".join(f"{item['key']} ({item['count']}, x{item['growth']})"
+                                   for item in trends[window][dimension][:5])
+                if rising:
+                    logger.info(f"Rising {dimension} in the last {window}: {rising}")
+        
+        self.trend_engine.save()
+        return trends
 
-    def generate_daily_report(self):
-        """Generate a daily summary report of collected misinformation data"""
+    def generate_daily_report(self, date=None):
+        """
+        Generate a summary report of the data collected on one UTC day
+        (default: yesterday). Scheduled runs also include what is trending in
+        the trend engine's current 24h window, labelled as such; reports for
+        an explicit (e.g. backfilled) date leave it out.
+        """
         logger.info("Generating daily report...")
         
+        include_trends = date is None
+        date = date or (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
+        # Counters the backend maintained at ingest time - one read, not a scan of every item
+        rollup = fetch_daily_rollup(date, self.collector.sink)
+        if rollup is None:
+            raise RuntimeError(f"Daily rollup for {date} is unavailable")
+        
         report_data = {
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "total_items_collected": 0,  # Would query from database
-            "top_platforms": [],  # Most active platforms
-            "trending_topics": [],  # Most discussed misinformation topics
-            "new_sources_detected": [],  # New misinformation sources found
+            "date": date,
+            "total_items_collected": rollup["total"],
+            "top_platforms": [
+                {"platform": platform, "count": count}
+                for platform, count in sorted(rollup["by_platform"].items(), key=lambda item: item[1], reverse=True)
+            ],
+            "by_source": rollup["by_source"],
+            "by_type": rollup["by_type"],
             "fact_check_opportunities": []  # Content that needs fact-checking
         }
+        if include_trends:
+            # The sliding windows only cover the 24 hours before now, not the report's date
+            report_data["current_trends"] = {
+                "window": "24h",
+                "as_of": datetime.now().isoformat(),
+                "trending_topics": self.trend_engine.top("terms", "24h"),
+                # Domains seen in the window that were absent from the 24h before it
+                "new_sources_detected": [
+                    item["key"] for item in self.trend_engine.rising("domains", "24h", k=20, min_count=1)
+                    if item["previous"] == 0
+                ]
+            }
         
         # Save report (could send to email, Slack, etc.)
+        os.makedirs("reports", exist_ok=True)
         with open(f"reports/daily_report_{report_data['date']}.json", "w") as f:
             json.dump(report_data, f, indent=2)
+        return report_data
+
+    def scheduler_metrics(self):
+        """Per-job run, failure, timeout and missed/late-run counters"""
+        return self.scheduler.metrics()
 
     def start_monitoring(self):
         """Start the automated monitoring system"""
         logger.info("Starting automated content monitoring system...")
         
-        # Schedule different monitoring tasks
-        schedule.every(30).minutes.do(self.monitor_reddit_discussions)
-        schedule.every(1).hours.do(self.monitor_news_sites)
-        schedule.every(6).hours.do(self.analyze_trends)
-        schedule.every().day.at("09:00").do(self.generate_daily_report)
+        # Each job runs on its own thread, so a slow Reddit cycle can't hold up the others
+        self.scheduler.add("reddit", self.monitor_reddit_discussions, every=30 * 60, timeout=25 * 60, jitter=0.05)
+        self.scheduler.add("news", self.monitor_news_sites, every=60 * 60, timeout=45 * 60, jitter=0.05)
+        self.scheduler.add("trends", self.analyze_trends, every=60 * 60, timeout=5 * 60, jitter=0.02)
+        self.scheduler.add("daily_report", self.generate_daily_report, at="09:00", timeout=10 * 60,
+                           error_budget=2, cooldown=0)
         
         logger.info("Monitoring system started. Running continuously...")
         
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-            except KeyboardInterrupt:
-                logger.info("Monitoring system stopped by user")
-                break
-            except Exception as e:
-                logger.error(f"Error in monitoring system: {e}")
-                time.sleep(300)  # Wait 5 minutes before retrying
+        try:
+            asyncio.run(self.scheduler.run())
+        except KeyboardInterrupt:
+            logger.info("Monitoring system stopped by user")
+            logger.info(f"Scheduler metrics: {self.scheduler_metrics()}")
+        finally:
+            self.trend_engine.save()
 
 if __name__ == "__main__":
     monitor = ContentMonitor()
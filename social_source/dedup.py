@@ -0,0 +1,68 @@
+"""
+Ingest Deduplication
+Normalized content fingerprints and a bounded in-memory cache of items
+already sent to the backend
+"""
+
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# Metadata keys that identify an item on its platform, most specific first.
+# backend_service/main.py uses the same list - keep them in sync.
+PLATFORM_ID_KEYS = ("post_id", "tweet_id", "video_id", "link", "url", "file_path")
+# Metadata key holding a file's SHA-256, so an edited file at the same path is new content
+CONTENT_HASH_KEY = "content_sha256"
+
+def normalize_text(text):
+    """Unicode-normalize, case-fold and collapse whitespace"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return " ".join(text.casefold().split())
+
+def platform_id(metadata):
+    """Return the first platform identifier found in the metadata, or ''"""
+    if not isinstance(metadata, dict):
+        return ""
+    for key in PLATFORM_ID_KEYS:
+        value = metadata.get(key)
+        if value:
+            return str(value)
+    return ""
+
+def content_fingerprint(source, content_text, metadata=None):
+    """SHA-256 over source, platform ID, normalized content text and the file hash if any"""
+    parts = [source or "", platform_id(metadata), normalize_text(content_text)]
+    if isinstance(metadata, dict) and metadata.get(CONTENT_HASH_KEY):
+        parts.append(str(metadata[CONTENT_HASH_KEY]))
+    key = "\x1f".join(parts)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+class SeenCache:
+    """Thread-safe LRU map of fingerprint -> value with O(1) lookups"""
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint):
+        with self._lock:
+            value = self._entries.get(fingerprint)
+            if value is not None:
+                self._entries.move_to_end(fingerprint)
+            return value
+
+    def put(self, fingerprint, value):
+        with self._lock:
+            self._entries[fingerprint] = value
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, fingerprint):
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+
+    def __len__(self):
+        return len(self._entries)
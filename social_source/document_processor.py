@@ -4,79 +4,305 @@ Handles various file types: PDFs, DOCs, images, videos, etc.
 """
 
 import os
-import requests
+import re
+import mmap
+import codecs
+from collections import deque
+from functools import partial
 from pathlib import Path
-import mimetypes
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import json
 from dotenv import load_dotenv
 import logging
+from backend_sink import BackendSink, get_default_sink
+from scan_manifest import ScanManifest, plan_rescan, file_sha256
+from file_types import sniff_mime_type, lazy_import, DOCX_MIME
+
+# For document processing. Each library is imported the first time a file
+# that needs it is processed.
+PyPDF2 = lazy_import("PyPDF2")
+docx = lazy_import("docx", "python-docx")
+Image = lazy_import("PIL.Image", "Pillow")
+cv2 = lazy_import("cv2", "opencv-python")
+np = lazy_import("numpy")
+perceptual_hash = lazy_import("perceptual_hash", "opencv-python numpy")
 
-# For document processing
 try:
-    import PyPDF2
-    import docx
-    from PIL import Image
-    import cv2
+    from charset_normalizer import from_bytes
 except ImportError:
-    print("Some libraries not installed. Install with:")
-    print("pip install PyPDF2 python-docx Pillow opencv-python")
+    from_bytes = None
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-API_BASE_URL = os.getenv("API_BASE_URL", "https://misinformation-collector-zda54hwita-el.a.run.app")
+# Streaming PDF ingestion: process_file streams PDFs with at least
+# PDF_STREAM_MIN_PAGES pages as records of PDF_PAGES_PER_CHUNK pages, each
+# capped at PDF_MAX_CHUNK_CHARS characters
+PDF_STREAM_MIN_PAGES = int(os.getenv("PDF_STREAM_MIN_PAGES", "200"))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "20"))
+PDF_MAX_CHUNK_CHARS = int(os.getenv("PDF_MAX_CHUNK_CHARS", "1000000"))
+# Streaming text ingestion: text-like files (plain text, CSV, Markdown, JSON,
+# logs...) of at least TEXT_STREAM_MIN_BYTES are streamed as segments of up to
+# TEXT_SEGMENT_CHARS characters
+TEXT_STREAM_MIN_BYTES = int(os.getenv("TEXT_STREAM_MIN_BYTES", str(10 * 1024 * 1024)))
+TEXT_SEGMENT_CHARS = int(os.getenv("TEXT_SEGMENT_CHARS", "200000"))
+ENCODING_SNIFF_BYTES = 64 * 1024
+TEXT_READ_BYTES = 1024 * 1024
+# Video keyframe fingerprints: one frame every VIDEO_KEYFRAME_INTERVAL seconds,
+# at most VIDEO_MAX_KEYFRAMES per video
+VIDEO_KEYFRAME_INTERVAL = float(os.getenv("VIDEO_KEYFRAME_INTERVAL", "5"))
+VIDEO_MAX_KEYFRAMES = int(os.getenv("VIDEO_MAX_KEYFRAMES", "120"))
+# Estimated decoder memory of videos being fingerprinted at once on a pool
+VIDEO_MEMORY_BUDGET_MB = int(os.getenv("VIDEO_MEMORY_BUDGET_MB", "1024"))
+# Decoded frames a video decoder keeps around (reference frames, output queue)
+VIDEO_DECODER_FRAMES = 16
+# Chunk records handed to the backend sink but not yet sent, when streaming.
+# A full window is flushed as one batch instead of waiting out the sink's timer.
+MAX_PENDING_CHUNKS = int(os.getenv("MAX_PENDING_CHUNKS", "16"))
+
+def parse_page_range(value):
+    """Parse '10-250', '10-' or '7' into a 1-based (first, last) tuple; last may be None"""
+    first, sep, last = value.partition("-")
+    first = int(first) if first.strip() else 1
+    if not sep:
+        return first, first
+    return first, int(last) if last.strip() else None
+
+def iter_pdf_pages(pdf_reader, page_range=None):
+    """Yield (page_number, text) one page at a time, page_number 1-based"""
+    total = len(pdf_reader.pages)
+    first, last = page_range or (1, None)
+    first = max(first, 1)
+    last = min(last or total, total)
+    for page_number in range(first, last + 1):
+        yield page_number, pdf_reader.pages[page_number - 1].extract_text() or ""
+
+def iter_pdf_windows(pages, pages_per_chunk=PDF_PAGES_PER_CHUNK, max_chars=PDF_MAX_CHUNK_CHARS):
+    """
+    Group (page_number, text) pairs into (page_start, page_end, text) windows of
+    at most pages_per_chunk pages and max_chars characters. A single page longer
+    than max_chars is split across several windows.
+    """
+    buffer = []
+    size = 0
+    page_start = None
+    page_end = None
+
+    for page_number, text in pages:
+        if buffer and (len(buffer) >= pages_per_chunk or size + len(text) + 1 > max_chars):
+            yield page_start, page_end, "\n".join(buffer)
+            buffer, size = [], 0
+
+        if len(text) > max_chars:
+            for offset in range(0, len(text), max_chars):
+                yield page_number, page_number, text[offset:offset + max_chars]
+            continue
+
+        if not buffer:
+            page_start = page_number
+        buffer.append(text)
+        size += len(text) + 1
+        page_end = page_number
+
+    if buffer:
+        yield page_start, page_end, "\n".join(buffer)
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16")
+)
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s")
+
+def detect_encoding(prefix):
+    """Guess the encoding of a text file from its first bytes"""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        # Incremental, so a multi-byte character cut off at the end of the prefix is fine
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    # Statistical detection needs some text to go on; short files get the Windows default
+    if from_bytes is not None and len(prefix) >= 1024:
+        best = from_bytes(prefix).best()
+        if best is not None:
+            return best.encoding
+    return "cp1252"
+
+def sniff_encoding(file_path):
+    with open(file_path, 'rb') as file:
+        return detect_encoding(file.read(ENCODING_SNIFF_BYTES))
+
+def _segment_boundary(text, limit):
+    """Cut position <= limit: after the last newline, else the last sentence end, else limit"""
+    cut = text.rfind("\n", 0, limit) + 1
+    if cut > limit // 2:
+        return cut
+    sentence_ends = [match.end() for match in _SENTENCE_END.finditer(text, limit // 2, limit)]
+    if sentence_ends:
+        return sentence_ends[-1]
+    return cut or limit
+
+def iter_text_segments(file_path, encoding, max_chars=TEXT_SEGMENT_CHARS):
+    """
+    Decode a memory-mapped text file incrementally and yield (char_offset, text)
+    segments of at most max_chars, split on line or sentence boundaries
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with open(file_path, 'rb') as file:
+        try:
+            view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return
+
+        with view:
+            buffer = ""
+            offset = 0
+            for start in range(0, len(view), TEXT_READ_BYTES):
+                final = start + TEXT_READ_BYTES >= len(view)
+                buffer += decoder.decode(view[start:start + TEXT_READ_BYTES], final=final)
+                while len(buffer) > max_chars or (final and buffer):
+                    cut = _segment_boundary(buffer, max_chars) if len(buffer) > max_chars else len(buffer)
+                    yield offset, buffer[:cut]
+                    offset += cut
+                    buffer = buffer[cut:]
+
+def keyframe_times(duration, interval=VIDEO_KEYFRAME_INTERVAL, max_frames=VIDEO_MAX_KEYFRAMES):
+    """Sample timestamps every interval seconds, spread evenly when that exceeds max_frames"""
+    if duration <= 0:
+        return [0.0]
+    count = int(duration // interval) + 1
+    if count > max_frames:
+        interval = duration / max_frames
+        count = max_frames
+    return [round(index * interval, 3) for index in range(count)]
+
+def estimate_video_memory(file_path):
+    """Rough bytes needed to decode a video, from its frame size"""
+    cap = cv2.VideoCapture(str(file_path))
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    return width * height * 3 * VIDEO_DECODER_FRAMES
+
+# Sniffed MIME type -> name of the DocumentProcessor method that handles it
+PROCESSORS = {
+    'application/pdf': 'process_pdf',
+    DOCX_MIME: 'process_docx',
+    'application/msword': 'process_doc',
+    'text/plain': 'process_text',
+    'text/csv': 'process_text',
+    'text/markdown': 'process_text',
+    'application/json': 'process_text',
+    'image/jpeg': 'process_image',
+    'image/png': 'process_image',
+    'image/gif': 'process_image',
+    'image/bmp': 'process_image',
+    'image/tiff': 'process_image',
+    'image/webp': 'process_image',
+    'video/mp4': 'process_video',
+    'video/quicktime': 'process_video',
+    'video/x-msvideo': 'process_video',
+    'video/x-matroska': 'process_video',
+    'video/webm': 'process_video'
+}
 
 class DocumentProcessor:
-    def __init__(self):
-        self.supported_types = {
-            'application/pdf': self.process_pdf,
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': self.process_docx,
-            'application/msword': self.process_doc,
-            'text/plain': self.process_text,
-            'image/jpeg': self.process_image,
-            'image/png': self.process_image,
-            'image/gif': self.process_image,
-            'video/mp4': self.process_video,
-            'video/avi': self.process_video,
-            'video/mov': self.process_video
-        }
-
-    def process_file(self, file_path, source="file_upload"):
+    def __init__(self, sink=None, video_keyframes=False):
+        self._sink = sink
+        # Fingerprint sampled keyframes of videos (slower than reading properties only)
+        self.video_keyframes = video_keyframes
+        self.supported_types = dict(PROCESSORS)
+
+    def register(self, mime_types, processor):
+        """
+        Handle mime_types with processor: the name of a method of this class or
+        any callable taking a Path and returning a record (or None)
+        """
+        if isinstance(mime_types, str):
+            mime_types = [mime_types]
+        for mime_type in mime_types:
+            self.supported_types[mime_type] = processor
+
+    @property
+    def sink(self):
+        # Resolved lazily so pool workers, which never send, don't start a sink thread
+        if self._sink is None:
+            self._sink = get_default_sink()
+        return self._sink
+
+    def process_file(self, file_path, source="file_upload", page_range=None):
         """Process any supported file type"""
+        result = self.extract_or_stream(file_path, source, page_range)
+        
+        if result and not result.get("streamed") and result["type"] != "unknown_file":
+            # Send to backend
+            self.send_to_backend(result, source)
+        return result
+
+    def extract_or_stream(self, file_path, source="file_upload", page_range=None):
+        """
+        Stream files too large for a single record straight to the backend and
+        return their summary record (marked "streamed"), else extract_file
+        """
+        streamer = self._streaming_processor(file_path, page_range)
+        if streamer:
+            return streamer(file_path, source)
+        return self.extract_file(file_path)
+
+    def extract_file(self, file_path):
+        """Extract a record from a file without sending it anywhere"""
         if not os.path.exists(file_path):
             logger.error(f"File not found: {file_path}")
             return None
 
         file_path = Path(file_path)
-        mime_type, _ = mimetypes.guess_type(str(file_path))
+        try:
+            mime_type = sniff_mime_type(file_path)
+        except OSError as e:
+            logger.error(f"Error reading file {file_path}: {e}")
+            return None
         
         if mime_type not in self.supported_types:
             logger.warning(f"Unsupported file type: {mime_type}")
-            return self.process_unknown_file(file_path)
+            result = self.process_unknown_file(file_path)
+        else:
+            try:
+                processor = self.supported_types[mime_type]
+                if isinstance(processor, str):
+                    processor = getattr(self, processor)
+                result = processor(file_path)
 
-        try:
-            processor = self.supported_types[mime_type]
-            result = processor(file_path)
-            
-            if result:
-                # Send to backend
-                self.send_to_backend(result, source)
-                return result
-            
-        except Exception as e:
-            logger.error(f"Error processing file {file_path}: {e}")
-            return None
+            except Exception as e:
+                logger.error(f"Error processing file {file_path}: {e}")
+                return None
+
+        if result:
+            try:
+                # Part of the dedup fingerprint: records such as "Image file: <name>"
+                # only change with the file's bytes
+                result["metadata"]["content_sha256"] = file_sha256(file_path)
+            except OSError as e:
+                logger.error(f"Error reading file {file_path}: {e}")
+                return None
+        return result
 
     def process_pdf(self, file_path):
         """Extract text from PDF files"""
         try:
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                text_content = ""
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    text_content += page.extract_text() + "\n"
+                text_content = "\n".join(text for _, text in iter_pdf_pages(pdf_reader))
 
                 return {
                     "type": "pdf_document",
@@ -93,6 +319,113 @@ class DocumentProcessor:
             logger.error(f"Error processing PDF: {e}")
             return None
 
+    def _streaming_processor(self, file_path, page_range=None):
+        """stream_pdf / stream_text for files too large for a single record, else None"""
+        try:
+            mime_type = sniff_mime_type(file_path)
+        except OSError:
+            # extract_file reports unreadable files
+            return None
+        if mime_type == 'application/pdf':
+            if page_range or self._pdf_page_count(file_path) >= PDF_STREAM_MIN_PAGES:
+                return partial(self.stream_pdf, page_range=page_range)
+        elif (self.supported_types.get(mime_type) == 'process_text'
+              and os.path.getsize(file_path) >= TEXT_STREAM_MIN_BYTES):
+            return partial(self.stream_text, mime_type=mime_type)
+        return None
+
+    def _pdf_page_count(self, file_path):
+        try:
+            with open(file_path, 'rb') as file:
+                return len(PyPDF2.PdfReader(file).pages)
+        except Exception:
+            # Let process_pdf report the error
+            return 0
+
+    def stream_pdf(self, file_path, source="file_upload", pages_per_chunk=PDF_PAGES_PER_CHUNK,
+                   max_chunk_chars=PDF_MAX_CHUNK_CHARS, page_range=None):
+        """
+        Send a PDF to the backend as page-window records ("pdf_document_chunk")
+        without ever holding the whole text. Returns a summary record.
+        """
+        file_path = Path(file_path)
+        try:
+            document_id = file_sha256(file_path)
+            last_page = 0
+
+            with open(file_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                total_pages = len(pdf_reader.pages)
+
+                def records():
+                    nonlocal last_page
+                    windows = iter_pdf_windows(iter_pdf_pages(pdf_reader, page_range), pages_per_chunk, max_chunk_chars)
+                    for chunk_index, (page_start, page_end, text) in enumerate(windows):
+                        last_page = page_end
+                        yield {
+                            "type": "pdf_document_chunk",
+                            "content": text.strip(),
+                            "metadata": {
+                                "filename": file_path.name,
+                                "file_path": str(file_path),
+                                "document_id": document_id,
+                                "content_sha256": document_id,
+                                "chunk_index": chunk_index,
+                                "page_start": page_start,
+                                "page_end": page_end,
+                                "total_pages": total_pages,
+                                "mime_type": "application/pdf"
+                            }
+                        }
+
+                chunks, failed = self._send_chunks(records(), source)
+
+            logger.info(f"Streamed {file_path.name}: {chunks} chunks ({failed} failed), "
+                        f"up to page {last_page} of {total_pages}")
+
+            return {
+                "type": "pdf_document",
+                "streamed": True,
+                "content": f"PDF document: {file_path.name} ({chunks} chunks)",
+                "metadata": {
+                    "filename": file_path.name,
+                    "file_size": file_path.stat().st_size,
+                    "pages": total_pages,
+                    "page_range": list(page_range) if page_range else None,
+                    "chunks": chunks,
+                    "chunks_failed": failed,
+                    "document_id": document_id,
+                    "file_path": str(file_path),
+                    "mime_type": "application/pdf"
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error streaming PDF: {e}")
+            return None
+
+    def _send_chunks(self, records, source):
+        """
+        Send chunk records one by one with at most MAX_PENDING_CHUNKS waiting in
+        the sink, so a large document is never fully in memory.
+        Returns (chunks, failed).
+        """
+        pending = deque()
+        chunks = 0
+        failed = 0
+        for record in records:
+            if len(pending) >= MAX_PENDING_CHUNKS:
+                if not pending[0].done():
+                    # Send the window now; the sink would otherwise wait for its flush interval
+                    self.sink.flush()
+                if pending.popleft().result() is None:
+                    failed += 1
+            pending.append(self.send_to_backend(record, source))
+            chunks += 1
+        if pending:
+            self.sink.flush()
+        failed += sum(1 for future in pending if future.result() is None)
+        return chunks, failed
+
     def process_docx(self, file_path):
         """Extract text from DOCX files"""
         try:
@@ -126,7 +459,8 @@ class DocumentProcessor:
     def process_text(self, file_path):
         """Process plain text files"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
+            encoding = sniff_encoding(file_path)
+            with open(file_path, 'r', encoding=encoding, errors='replace') as file:
                 content = file.read()
 
             return {
@@ -135,7 +469,7 @@ class DocumentProcessor:
                 "metadata": {
                     "filename": file_path.name,
                     "file_size": file_path.stat().st_size,
-                    "encoding": "utf-8",
+                    "encoding": encoding,
                     "file_path": str(file_path),
                     "mime_type": "text/plain"
                 }
@@ -144,6 +478,58 @@ class DocumentProcessor:
             logger.error(f"Error processing text file: {e}")
             return None
 
+    def stream_text(self, file_path, source="file_upload", max_segment_chars=TEXT_SEGMENT_CHARS,
+                    mime_type="text/plain"):
+        """
+        Send a large text file to the backend as linked "text_document_segment"
+        records, read through a memory map. Returns a summary record.
+        """
+        file_path = Path(file_path)
+        try:
+            encoding = sniff_encoding(file_path)
+            document_id = file_sha256(file_path)
+
+            def records():
+                for segment_index, (char_offset, text) in enumerate(
+                        iter_text_segments(file_path, encoding, max_segment_chars)):
+                    yield {
+                        "type": "text_document_segment",
+                        "content": text,
+                        "metadata": {
+                            "filename": file_path.name,
+                            "file_path": str(file_path),
+                            "document_id": document_id,
+                            "content_sha256": document_id,
+                            "segment_index": segment_index,
+                            "char_offset": char_offset,
+                            "char_length": len(text),
+                            "encoding": encoding,
+                            "mime_type": mime_type
+                        }
+                    }
+
+            segments, failed = self._send_chunks(records(), source)
+            logger.info(f"Streamed {file_path.name}: {segments} segments ({failed} failed), encoding {encoding}")
+
+            return {
+                "type": "text_document",
+                "streamed": True,
+                "content": f"Text document: {file_path.name} ({segments} segments)",
+                "metadata": {
+                    "filename": file_path.name,
+                    "file_size": file_path.stat().st_size,
+                    "encoding": encoding,
+                    "segments": segments,
+                    "segments_failed": failed,
+                    "document_id": document_id,
+                    "file_path": str(file_path),
+                    "mime_type": mime_type
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error streaming text file: {e}")
+            return None
+
     def process_image(self, file_path):
         """Process image files and extract metadata"""
         try:
@@ -155,6 +541,9 @@ class DocumentProcessor:
                     if exif:
                         exif_data = {str(k): str(v) for k, v in exif.items()}
 
+                # Perceptual hashes, matched against earlier images by the backend's near-duplicate index
+                gray = np.asarray(img.convert("L"))
+
                 return {
                     "type": "image_file",
                     "content": f"Image file: {file_path.name}",
@@ -165,6 +554,8 @@ class DocumentProcessor:
                         "format": img.format,
                         "mode": img.mode,
                         "exif_data": exif_data,
+                        "phash": perceptual_hash.phash(gray),
+                        "dhash": perceptual_hash.dhash(gray),
                         "file_path": str(file_path),
                         "mime_type": f"image/{img.format.lower()}"
                     }
@@ -185,9 +576,10 @@ class DocumentProcessor:
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             
+            keyframes = self._sample_keyframes(cap, fps, frame_count, duration) if self.video_keyframes else None
             cap.release()
 
-            return {
+            result = {
                 "type": "video_file",
                 "content": f"Video file: {file_path.name}",
                 "metadata": {
@@ -198,13 +590,33 @@ class DocumentProcessor:
                     "frame_count": frame_count,
                     "dimensions": f"{width}x{height}",
                     "file_path": str(file_path),
-                    "mime_type": mimetypes.guess_type(str(file_path))[0]
+                    "mime_type": sniff_mime_type(file_path)
                 }
             }
+            if keyframes is not None:
+                result["metadata"]["keyframes"] = keyframes
+                # pHash sequence, compared frame by frame against earlier uploads
+                result["metadata"]["fingerprint"] = [frame["phash"] for frame in keyframes]
+            return result
         except Exception as e:
             logger.error(f"Error processing video: {e}")
             return None
 
+    def _sample_keyframes(self, cap, fps, frame_count, duration):
+        """Seek to sampled timestamps and hash one frame at each; no other frames are decoded"""
+        keyframes = []
+        if fps <= 0 or frame_count <= 0:
+            return keyframes
+
+        for seconds in keyframe_times(duration):
+            frame_index = min(int(seconds * fps), frame_count - 1)
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            ok, frame = cap.read()
+            if not ok:
+                continue
+            keyframes.append({"time": seconds, "phash": perceptual_hash.phash(frame), "dhash": perceptual_hash.dhash(frame)})
+        return keyframes
+
     def process_unknown_file(self, file_path):
         """Handle unknown file types"""
         try:
@@ -216,7 +628,7 @@ class DocumentProcessor:
                     "file_size": file_path.stat().st_size,
                     "file_extension": file_path.suffix,
                     "file_path": str(file_path),
-                    "mime_type": mimetypes.guess_type(str(file_path))[0] or "unknown"
+                    "mime_type": sniff_mime_type(file_path) or "unknown"
                 }
             }
         except Exception as e:
@@ -224,47 +636,224 @@ class DocumentProcessor:
             return None
 
     def send_to_backend(self, data, source="document_processor"):
-        """Send processed document data to backend"""
-        try:
-            payload = {
-                "source": source,
-                "type": data.get("type", "document"),
-                "content_text": data.get("content", ""),
-                "metadata": json.dumps(data.get("metadata", {}))
-            }
-            
-            response = requests.post(f"{API_BASE_URL}/collect", data=payload, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Document sent to backend successfully: {result.get('doc_id')}")
-                return result
-            else:
-                logger.error(f"Failed to send document to backend: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error sending document to backend: {e}")
-            return None
+        """Queue processed document data for the backend; returns a Future of the result"""
+        return self.sink.submit(
+            source,
+            data.get("type", "document"),
+            data.get("content", ""),
+            data.get("metadata", {})
+        )
+
+    def batch_process_directory(self, directory_path, source="batch_upload", workers=1, manifest_path=None):
+        """
+        Process all files in a directory, in parallel when workers > 1.
+        With manifest_path set, only files that are new or changed since the
+        previous run are processed (see scan_manifest).
+        """
+        results = []
+        for file_path, result in self.iter_process_directory(directory_path, source, workers, manifest_path):
+            if result:
+                results.append(result)
+
+        logger.info(f"Batch processing complete. Processed {len(results)} files.")
+        return results
 
-    def batch_process_directory(self, directory_path, source="batch_upload"):
-        """Process all files in a directory"""
+    def iter_process_directory(self, directory_path, source="batch_upload", workers=1, manifest_path=None):
+        """Yield (file_path, result or None) for every processed file as it completes"""
         directory = Path(directory_path)
         
         if not directory.exists():
             logger.error(f"Directory not found: {directory_path}")
-            return []
+            return
 
-        results = []
-        for file_path in directory.rglob('*'):
-            if file_path.is_file():
-                logger.info(f"Processing: {file_path}")
-                result = self.process_file(file_path, source)
-                if result:
-                    results.append(result)
+        if manifest_path:
+            yield from self._process_incremental(directory, source, workers, manifest_path)
+            return
 
-        logger.info(f"Batch processing complete. Processed {len(results)} files.")
-        return results
+        files = (file_path for file_path in directory.rglob('*') if file_path.is_file())
+        yield from self._process_files(files, source, workers)
+
+    def _process_files(self, files, source, workers, on_sent=None):
+        """Process files serially or on a pool; on_sent(file_path, result, future) after each send"""
+        if workers <= 1:
+            results = ((file_path, self.extract_or_stream(file_path, source)) for file_path in files)
+        else:
+            results = _extract_in_pool(
+                files, workers,
+                options={"video_keyframes": self.video_keyframes},
+                source=source,
+                api_base_url=self.sink.api_base_url,
+                # Decoding several high-resolution videos at once is what exhausts memory
+                cost=_video_cost if self.video_keyframes else None,
+                budget=VIDEO_MEMORY_BUDGET_MB * 1024 * 1024
+            )
+
+        for file_path, result in results:
+            logger.info(f"Processed: {file_path}")
+            if result and result.get("streamed"):
+                # Its chunks were sent while streaming; only the summary is left
+                if on_sent:
+                    on_sent(file_path, result, _streamed_future(result))
+            elif result and result["type"] != "unknown_file":
+                future = self.send_to_backend(result, source)
+                if on_sent:
+                    on_sent(file_path, result, future)
+            elif result and on_sent:
+                on_sent(file_path, result, None)
+            yield file_path, result
+
+    def _process_incremental(self, directory, source, workers, manifest_path):
+        """Process only new/modified files and record them in the manifest"""
+        manifest = ScanManifest(manifest_path)
+        try:
+            plan = plan_rescan(directory, manifest)
+            pending = {path: (size, mtime_ns, content_hash) for path, size, mtime_ns, content_hash in plan["to_process"]}
+
+            def on_sent(file_path, result, future):
+                path = str(file_path)
+                size, mtime_ns, content_hash = pending[path]
+                if future is None:
+                    manifest.record(path, size, mtime_ns, content_hash)
+                    return
+
+                def on_stored(done):
+                    # Sends that fail are left out of the manifest so the next run retries them
+                    stored = done.result()
+                    if stored:
+                        manifest.record(path, size, mtime_ns, content_hash, stored.get("doc_id"))
+                future.add_done_callback(on_stored)
+
+            yield from self._process_files((Path(path) for path in pending), source, workers, on_sent)
+
+            # Wait for outstanding sends before the final commit
+            self.sink.flush()
+        finally:
+            manifest.close()
+
+_worker_processor = None
+
+def _extract_in_worker(file_path, options=None, source=None, api_base_url=None):
+    """
+    Pool entry point: one DocumentProcessor per worker process. With source
+    set, files too large for one record are streamed from the worker to
+    api_base_url.
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = DocumentProcessor(**(options or {}))
+    streamer = _worker_processor._streaming_processor(file_path) if source else None
+    if streamer is None:
+        return _worker_processor.extract_file(file_path)
+    if _worker_processor._sink is None:
+        # A forked worker inherits the parent's sink object but not its thread
+        _worker_processor._sink = BackendSink(api_base_url) if api_base_url else BackendSink()
+    return streamer(file_path, source)
+
+def _streamed_future(result):
+    """
+    Resolved Future standing in for the send of a streamed file's summary.
+    A streamed file is stored as many chunk docs, so it has no single doc_id.
+    """
+    metadata = result["metadata"]
+    failed = metadata.get("chunks_failed", metadata.get("segments_failed"))
+    future = Future()
+    future.set_result(None if failed else {"status": "success", "doc_id": None})
+    return future
+
+def _video_cost(file_path):
+    """Memory cost of a file for _extract_in_pool's budget: decoder memory for videos, else 0"""
+    try:
+        if not (sniff_mime_type(file_path) or "").startswith("video/"):
+            return 0
+        return estimate_video_memory(file_path)
+    except Exception:
+        return 0
+
+def _extract_in_pool(files, workers, max_pending=None, max_attempts=2, options=None,
+                     cost=None, budget=None, source=None, api_base_url=None):
+    """
+    Extract files on a process pool with at most max_pending files in flight.
+    Yields (file_path, result or None) in completion order. A worker crash only
+    affects the files that were in flight: the pool is restarted and those files
+    are rerun one at a time, so only a file that crashes the pool while running
+    alone counts an attempt, and it is given up after max_attempts such crashes.
+    With cost and budget, a file is only started while the summed cost(file_path)
+    of files in flight stays within budget (a single file may exceed it alone).
+    With source set, workers stream large files to api_base_url themselves.
+    """
+    max_pending = max_pending or workers * 2
+    files = iter(files)
+    # Files in flight during a crash, rerun alone to find the one that caused it
+    suspects = deque()
+    attempts = {}
+    pending = {}
+    costs = {}
+    held = None
+    pool = ProcessPoolExecutor(max_workers=workers)
+
+    def refill():
+        nonlocal held
+        if suspects:
+            if not pending:
+                file_path = suspects.popleft()
+                pending[pool.submit(_extract_in_worker, file_path, options, source, api_base_url)] = file_path
+            return
+        while len(pending) < max_pending:
+            if held is not None:
+                file_path, held = held, None
+            else:
+                file_path = next(files, None)
+                if file_path is None:
+                    return
+            if cost and budget:
+                if file_path not in costs:
+                    costs[file_path] = cost(file_path)
+                in_flight = sum(costs[path] for path in pending.values())
+                if pending and in_flight + costs[file_path] > budget:
+                    # Wait for running files to finish before starting this one
+                    held = file_path
+                    return
+            pending[pool.submit(_extract_in_worker, file_path, options, source, api_base_url)] = file_path
+
+    try:
+        refill()
+        while pending:
+            alone = len(pending) == 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            crashed = []
+            for future in done:
+                file_path = pending.pop(future)
+                costs.pop(file_path, None)
+                try:
+                    yield file_path, future.result()
+                except BrokenProcessPool:
+                    crashed.append(file_path)
+                except Exception as e:
+                    logger.error(f"Error processing file {file_path}: {e}")
+                    yield file_path, None
+
+            if crashed:
+                logger.warning("Worker process crashed - restarting pool")
+                pool.shutdown(wait=False, cancel_futures=True)
+                crashed.extend(pending.values())
+                pending.clear()
+                costs.clear()
+                if alone:
+                    # Nothing else was running, so this file crashed the worker
+                    file_path = crashed[0]
+                    attempts[file_path] = attempts.get(file_path, 0) + 1
+                    if attempts[file_path] < max_attempts:
+                        suspects.appendleft(file_path)
+                    else:
+                        logger.error(f"Giving up on {file_path}: worker crashed while processing it")
+                        yield file_path, None
+                else:
+                    suspects.extend(crashed)
+                pool = ProcessPoolExecutor(max_workers=workers)
+
+            refill()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
 def main():
     """Example usage of Document Processor"""
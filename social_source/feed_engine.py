@@ -0,0 +1,108 @@
+"""
+RSS Feed Engine
+Fetches every configured feed once per cycle, concurrently, using
+conditional GET so unchanged feeds cost a 304
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from keyword_matcher import KeywordMatcher
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEWS_FEEDS = [
+    {"name": "BBC", "rss": "http://feeds.bbci.co.uk/news/rss.xml"},
+    {"name": "Reuters", "rss": "http://feeds.reuters.com/reuters/topNews"},
+    {"name": "AP News", "rss": "https://rsshub.app/apnews/topics/apf-topnews"},
+    {"name": "NPR", "rss": "https://feeds.npr.org/1001/rss.xml"}
+]
+
+class FeedEngine:
+    def __init__(self, session, feeds=None, max_workers=8, cycle_seconds=300, timeout=15):
+        self.session = session
+        self.feeds = feeds or DEFAULT_NEWS_FEEDS
+        self.max_workers = max_workers
+        # Results younger than this are reused instead of re-fetching
+        self.cycle_seconds = cycle_seconds
+        self.timeout = timeout
+
+        # url -> {"etag", "last_modified", "entries"}
+        self._state = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        # tuple(keywords) -> KeywordMatcher, so repeated calls reuse the automaton
+        self._matchers = {}
+        self.stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+
+    def fetch_all(self, force=False):
+        """
+        Return [(feed, entries)] for every configured feed.
+        Feeds are fetched at most once per cycle and in parallel.
+        """
+        with self._lock:
+            fresh = self._fetched_at is not None and time.monotonic() - self._fetched_at < self.cycle_seconds
+            if force or not fresh:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.feeds))) as pool:
+                    for outcome in pool.map(self._fetch_feed, self.feeds):
+                        self.stats[outcome] += 1
+                self._fetched_at = time.monotonic()
+
+            return [(feed, self._state.get(feed["rss"], {}).get("entries", [])) for feed in self.feeds]
+
+    def _fetch_feed(self, feed):
+        """
+        Conditionally GET and parse one feed, keeping the last good entries
+        on failure. Returns "fetched", "not_modified" or "failed".
+        """
+        import feedparser
+
+        url = feed["rss"]
+        state = self._state.get(url, {})
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                return "not_modified"
+            response.raise_for_status()
+
+            parsed = feedparser.parse(response.content)
+            self._state[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "entries": parsed.entries
+            }
+            return "fetched"
+
+        except Exception as e:
+            logger.warning(f"Failed to fetch from {feed['name']}: {e}")
+            return "failed"
+
+    def match(self, keywords, entries_per_feed=3, matcher=None):
+        """
+        Match every keyword against the current entries in a single scan per
+        entry. By default a keyword matches if any of its words appears in the
+        title or summary; pass a prebuilt KeywordMatcher for other semantics.
+        Returns [(feed, entry, content, matched_keywords)].
+        """
+        if matcher is None:
+            key = tuple(keywords)
+            matcher = self._matchers.get(key)
+            if matcher is None:
+                matcher = self._matchers[key] = KeywordMatcher(keywords, any_word=True)
+
+        matches = []
+        for feed, entries in self.fetch_all():
+            for entry in entries[:entries_per_feed]:
+                content = f"{entry.get('title', '')} {entry.get('summary', '')}"
+                matched = matcher.find(content)
+                if matched:
+                    matches.append((feed, entry, content, matched))
+        return matches
@@ -0,0 +1,100 @@
+"""
+File Type Detection
+Identifies files from their leading bytes rather than their extension, and
+defers importing heavy format libraries until a file needs them
+"""
+
+import codecs
+import importlib
+import mimetypes
+import zipfile
+
+HEADER_BYTES = 1024
+
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+_OLE_MIME_TYPES = ('application/msword', 'application/vnd.ms-excel', 'application/vnd.ms-powerpoint')
+_TEXT_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+# ISO base media "ftyp" brands that are not video
+_FTYP_BRANDS = {b"qt  ": 'video/quicktime', b"heic": 'image/heic', b"heix": 'image/heic',
+                b"mif1": 'image/heif', b"M4A ": 'audio/mp4', b"avif": 'image/avif'}
+
+def _guess_from_extension(file_path):
+    mime_type, _ = mimetypes.guess_type(str(file_path))
+    return mime_type
+
+def _sniff_zip(file_path):
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            names = set(archive.namelist())
+    except (zipfile.BadZipFile, OSError):
+        return 'application/zip'
+    if 'word/document.xml' in names:
+        return DOCX_MIME
+    return 'application/zip'
+
+def sniff_mime_type(file_path):
+    """MIME type from the file's magic bytes; falls back to the extension"""
+    with open(file_path, 'rb') as file:
+        header = file.read(HEADER_BYTES)
+
+    if b"%PDF-" in header:
+        return 'application/pdf'
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return 'image/png'
+    if header.startswith(b"\xff\xd8\xff"):
+        return 'image/jpeg'
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return 'image/gif'
+    if header.startswith((b"II*\x00", b"MM\x00*")):
+        return 'image/tiff'
+    # BMP reserved header fields are always zero
+    if header.startswith(b"BM") and header[6:10] == b"\x00\x00\x00\x00":
+        return 'image/bmp'
+    if header.startswith(b"RIFF"):
+        form = header[8:12]
+        if form == b"WEBP":
+            return 'image/webp'
+        if form == b"AVI ":
+            return 'video/x-msvideo'
+        if form == b"WAVE":
+            return 'audio/wav'
+    if header[4:8] == b"ftyp":
+        return _FTYP_BRANDS.get(header[8:12], 'video/mp4')
+    if header.startswith(b"\x1aE\xdf\xa3"):
+        return 'video/webm' if b"webm" in header else 'video/x-matroska'
+    if header.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        # Legacy Office compound file; only the extension tells Word from Excel
+        guess = _guess_from_extension(file_path)
+        return guess if guess in _OLE_MIME_TYPES else 'application/msword'
+    if header.startswith(b"PK\x03\x04"):
+        return _sniff_zip(file_path)
+
+    if header.startswith(_TEXT_BOMS) or (header and b"\x00" not in header):
+        guess = _guess_from_extension(file_path)
+        if guess and (guess.startswith('text/') or guess == 'application/json'):
+            return guess
+        return 'text/plain'
+
+    return _guess_from_extension(file_path)
+
+class _LazyModule:
+    """Stand-in for a module that imports it on first attribute access"""
+
+    def __init__(self, name, package):
+        self._name = name
+        self._package = package
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError as e:
+                raise ImportError(
+                    f"{self._name} is needed for this file type. Install with: pip install {self._package}"
+                ) from e
+        return getattr(self._module, attr)
+
+def lazy_import(name, package=None):
+    """Module proxy for name; package is the pip name shown if it is missing"""
+    return _LazyModule(name, package or name)
@@ -0,0 +1,218 @@
+"""
+Persistent HTTP Response Cache
+A requests transport adapter that keeps GET responses in an on-disk SQLite
+store with per-host TTLs, Cache-Control/ETag revalidation and a size-bounded
+LRU eviction policy
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Used when the server sends no Cache-Control max-age / Expires
+DEFAULT_HOST_TTLS = {
+    "reddit.com": 300,
+    "feeds.bbci.co.uk": 300,
+    "feeds.reuters.com": 300,
+    "feeds.npr.org": 300,
+    "rsshub.app": 300
+}
+DEFAULT_TTL = 3600
+
+# Headers that no longer describe the stored (already decoded) body
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+def _parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+class ResponseCache:
+    """SQLite-backed store of response bodies with LRU eviction by total size"""
+
+    def __init__(self, path, max_bytes):
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER,
+                    headers TEXT,
+                    body BLOB,
+                    size INTEGER,
+                    expires REAL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    last_access REAL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+            self._db.commit()
+            self.total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, expires, etag, last_modified FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        status, headers, body, expires, etag, last_modified = row
+        return {"status": status, "headers": json.loads(headers), "body": body,
+                "expires": expires, "etag": etag, "last_modified": last_modified}
+
+    def put(self, url, status, headers, body, expires, etag, last_modified):
+        """Store a response; returns the number of entries evicted to make room"""
+        size = len(body)
+        if size > self.max_bytes:
+            return 0
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(headers), body, size, expires, etag, last_modified, time.time())
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            evicted = self._evict()
+            self._db.commit()
+        return evicted
+
+    def touch(self, url, expires):
+        """Extend an entry's freshness after a successful revalidation"""
+        with self._lock:
+            self._db.execute("UPDATE responses SET expires = ?, last_access = ? WHERE url = ?",
+                             (expires, time.time(), url))
+            self._db.commit()
+
+    def _evict(self):
+        evicted = 0
+        while self.total_bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT url, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM responses WHERE url = ?", (row[0],))
+            self.total_bytes -= row[1]
+            evicted += 1
+        return evicted
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+class CachingAdapter(HTTPAdapter):
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, host_ttls=None,
+                 default_ttl=DEFAULT_TTL, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = ResponseCache(os.path.join(cache_dir, "responses.sqlite"), max_bytes)
+        self.host_ttls = dict(DEFAULT_HOST_TTLS, **(host_ttls or {}))
+        self.default_ttl = default_ttl
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    def _host_ttl(self, url):
+        host = (urlsplit(url).hostname or "").lower()
+        for domain, ttl in self.host_ttls.items():
+            if host == domain or host.endswith("." + domain):
+                return ttl
+        return self.default_ttl
+
+    def _expires(self, url, headers):
+        """Absolute expiry time from Cache-Control / Expires, else the host TTL"""
+        directives = _parse_cache_control(headers.get("Cache-Control"))
+        if "no-cache" in directives:
+            return 0
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name, "").isdigit():
+                return time.time() + int(directives[name])
+        if headers.get("Expires"):
+            try:
+                return parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return 0
+        return time.time() + self._host_ttl(url)
+
+    def _cached_response(self, request, entry):
+        response = Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.reason = "OK"
+        response.from_cache = True
+        return response
+
+    def _store(self, request, response):
+        headers = response.headers
+        if "no-store" in _parse_cache_control(headers.get("Cache-Control")):
+            return
+        stored_headers = {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+        evicted = self.cache.put(
+            request.url, response.status_code, stored_headers, response.content,
+            self._expires(request.url, headers), headers.get("ETag"), headers.get("Last-Modified")
+        )
+        self.stats["stored"] += 1
+        self.stats["evicted"] += evicted
+
+    def send(self, request, stream=False, **kwargs):
+        cacheable = (
+            request.method == "GET" and not stream
+            # Callers doing their own conditional GET or range requests bypass the cache
+            and not any(h in request.headers for h in ("If-None-Match", "If-Modified-Since", "Range"))
+        )
+        if not cacheable:
+            return super().send(request, stream=stream, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry and entry["expires"] > time.time():
+            self.stats["hits"] += 1
+            return self._cached_response(request, entry)
+
+        if entry and (entry["etag"] or entry["last_modified"]):
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if entry and response.status_code == 304:
+            response.close()
+            self.stats["revalidated"] += 1
+            self.cache.touch(request.url, self._expires(request.url, response.headers))
+            return self._cached_response(request, entry)
+
+        self.stats["misses"] += 1
+        if response.status_code == 200:
+            self._store(request, response)
+        return response
+
+def install_cache(session, cache_dir, max_bytes=512 * 1024 * 1024, host_ttls=None):
+    """Mount a CachingAdapter on a session for http and https; returns the adapter"""
+    adapter = CachingAdapter(cache_dir, max_bytes=max_bytes, host_ttls=host_ttls)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
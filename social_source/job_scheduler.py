@@ -0,0 +1,190 @@
+"""
+Concurrent Job Scheduler
+asyncio scheduler for periodic collection jobs. Every job runs on its own
+thread with a timeout and start jitter, never overlaps itself, and is paused
+for a cooldown when it exhausts its error budget. Missed and late runs are
+counted per job.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A run that starts more than this many seconds after its slot counts as late
+LATE_AFTER_SECONDS = 60
+
+def _next_daily(at, now=None):
+    """Next local datetime for an "HH:MM" time of day"""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in at.split(":"))
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+class Job:
+    def __init__(self, name, func, every=None, at=None, timeout=None, jitter=0.0,
+                 error_budget=3, error_window=None, cooldown=None):
+        """
+        every: interval in seconds; at: "HH:MM" daily instead.
+        timeout: seconds before a run is abandoned (its thread is left to finish).
+        jitter: up to this fraction of the interval is added to each start.
+        error_budget failures within error_window seconds (default: the span
+        of error_budget runs) pause the job for cooldown seconds (default:
+        error_window).
+        """
+        if (every is None) == (at is None):
+            raise ValueError("Give exactly one of every= or at=")
+        self.name = name
+        self.func = func
+        self.every = every
+        self.at = at
+        self.timeout = timeout
+        self.jitter = jitter
+        self.error_budget = error_budget
+        self.error_window = error_window if error_window is not None else error_budget * self.period()
+        # Failed runs are at least a (jittered) period apart; a window that only just
+        # spans error_budget - 1 periods misses the last failure whenever a run is late
+        if error_budget > 1 and self.error_window <= (error_budget - 1) * self.period() * (1 + jitter):
+            raise ValueError(
+                f"Job {name}: {error_budget} failures can't fit in {self.error_window}s "
+                f"with runs every {self.period()}s"
+            )
+        self.cooldown = cooldown if cooldown is not None else self.error_window
+
+        # One thread per job: a slow job can only hold up itself
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"job-{name}")
+        self._running = None
+        self._failures = deque()
+        self.metrics = {
+            "runs": 0, "succeeded": 0, "failed": 0, "timed_out": 0,
+            "missed": 0, "late": 0, "max_lateness_seconds": 0.0,
+            "skipped_overlap": 0, "suspended": 0,
+            "last_duration_seconds": None, "last_error": None,
+            "last_success": None, "next_run": None, "suspended_until": None
+        }
+
+    def period(self):
+        return self.every if self.every is not None else 86400
+
+    def first_slot(self, now):
+        """Monotonic time of the first scheduled run"""
+        if self.at is not None:
+            return now + (_next_daily(self.at) - datetime.now()).total_seconds()
+        return now + self.every
+
+    def _record_failure(self, now, error):
+        self.metrics["failed"] += 1
+        self.metrics["last_error"] = error
+        self._failures.append(now)
+        while self._failures and self._failures[0] < now - self.error_window:
+            self._failures.popleft()
+        if len(self._failures) >= self.error_budget:
+            self._failures.clear()
+            self.metrics["suspended"] += 1
+            self.metrics["suspended_until"] = (datetime.now() + timedelta(seconds=self.cooldown)).isoformat()
+            logger.error(f"Job {self.name} failed {self.error_budget} times in {self.error_window}s; "
+                         f"pausing it for {self.cooldown}s")
+            return self.cooldown
+        return 0
+
+    async def run_once(self):
+        """Run the job once; returns extra seconds to wait before the next run"""
+        loop = asyncio.get_running_loop()
+        if self._running is not None and not self._running.done():
+            # A previous run that timed out is still going
+            self.metrics["skipped_overlap"] += 1
+            logger.warning(f"Job {self.name} skipped: previous run still in progress")
+            return 0
+
+        self.metrics["runs"] += 1
+        started = time.monotonic()
+        self._running = loop.run_in_executor(self._executor, self.func)
+        try:
+            await asyncio.wait_for(asyncio.shield(self._running), self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics["timed_out"] += 1
+            logger.error(f"Job {self.name} timed out after {self.timeout}s")
+            return self._record_failure(time.monotonic(), f"timed out after {self.timeout}s")
+        except Exception as e:
+            logger.error(f"Job {self.name} failed: {e}")
+            return self._record_failure(time.monotonic(), str(e))
+        finally:
+            self.metrics["last_duration_seconds"] = round(time.monotonic() - started, 3)
+
+        self.metrics["succeeded"] += 1
+        self.metrics["last_success"] = datetime.now().isoformat()
+        self.metrics["suspended_until"] = None
+        return 0
+
+    async def loop(self):
+        slot = self.first_slot(time.monotonic())
+        while True:
+            start_at = slot + random.uniform(0, self.jitter * self.period())
+            self.metrics["next_run"] = (datetime.now() + timedelta(seconds=start_at - time.monotonic())).isoformat()
+            await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+
+            lateness = time.monotonic() - start_at
+            if lateness > LATE_AFTER_SECONDS:
+                self.metrics["late"] += 1
+            self.metrics["max_lateness_seconds"] = round(max(self.metrics["max_lateness_seconds"], lateness), 3)
+
+            pause = await self.run_once()
+            slot = self._next_slot(slot, pause)
+
+    def _next_slot(self, slot, pause):
+        now = time.monotonic()
+        if self.at is not None:
+            resume = datetime.now() + timedelta(seconds=pause)
+            return now + pause + (_next_daily(self.at, resume) - resume).total_seconds()
+
+        if pause:
+            # Every slot inside the cooldown is missed; resume when it ends
+            self.metrics["missed"] += int(pause // self.every)
+            return now + pause
+
+        next_slot = slot + self.every
+        if next_slot <= now:
+            # The run overran its interval: the latest slot that has passed runs
+            # straight away (late), the ones before it are missed
+            passed = int((now - next_slot) // self.every) + 1
+            self.metrics["missed"] += passed - 1
+            next_slot += (passed - 1) * self.every
+        return next_slot
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class JobScheduler:
+    def __init__(self):
+        self.jobs = {}
+
+    def add(self, name, func, **options):
+        """Register func to run periodically; options are those of Job"""
+        self.jobs[name] = Job(name, func, **options)
+        return self.jobs[name]
+
+    def metrics(self):
+        """Per-job counters: runs, failures, timeouts, missed/late runs, next run"""
+        return {name: dict(job.metrics) for name, job in self.jobs.items()}
+
+    async def run(self, metrics_interval=900):
+        """Run every job concurrently until cancelled, logging metrics every metrics_interval seconds"""
+        tasks = [asyncio.create_task(job.loop(), name=name) for name, job in self.jobs.items()]
+        try:
+            while True:
+                await asyncio.sleep(metrics_interval)
+                logger.info(f"Scheduler metrics: {self.metrics()}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for job in self.jobs.values():
+                job.shutdown()
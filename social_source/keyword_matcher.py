@@ -0,0 +1,99 @@
+"""
+Multi-Keyword Matcher
+Aho-Corasick automaton built once from a keyword set; reports every
+matching keyword in a single case-folded scan of each text
+"""
+
+from collections import deque
+
+def _fold(text):
+    """Unicode case folding with whitespace collapsed to single spaces"""
+    return " ".join((text or "").casefold().split())
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+class KeywordMatcher:
+    def __init__(self, keywords, whole_words=False, any_word=False):
+        """
+        keywords: phrases to look for.
+        whole_words: only match at word boundaries ("hoax" does not match "hoaxes").
+        any_word: a keyword matches if any one of its words appears, instead of
+                  the whole phrase (the aggregator's original search semantics).
+        """
+        self.keywords = list(dict.fromkeys(keywords))
+        self.whole_words = whole_words
+
+        # pattern -> indexes of the keywords it stands for
+        pattern_keywords = {}
+        for index, keyword in enumerate(self.keywords):
+            folded = _fold(keyword)
+            patterns = folded.split() if any_word else [folded]
+            for pattern in patterns:
+                if pattern:
+                    pattern_keywords.setdefault(pattern, set()).add(index)
+
+        self._goto = [{}]
+        self._fail = [0]
+        # node -> [(pattern length, keyword indexes)] for patterns ending there
+        self._output = [[]]
+
+        for pattern, keyword_indexes in pattern_keywords.items():
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append((len(pattern), frozenset(keyword_indexes)))
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        """Breadth-first pass linking each node to its longest proper suffix"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, keyword_indexes) over the folded text"""
+        folded = _fold(text)
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            for length, keyword_indexes in self._output[node]:
+                start = position - length + 1
+                end = position + 1
+                if self.whole_words and (
+                    (start > 0 and _is_word_char(folded[start - 1])) or
+                    (end < len(folded) and _is_word_char(folded[end]))
+                ):
+                    continue
+                yield start, end, keyword_indexes
+
+    def find(self, text):
+        """Return every keyword that matches the text, in keyword order"""
+        found = set()
+        for _, _, keyword_indexes in self.iter_matches(text):
+            found.update(keyword_indexes)
+            if len(found) == len(self.keywords):
+                break
+        return [self.keywords[index] for index in sorted(found)]
+
+    def matches(self, text):
+        """True if any keyword matches the text"""
+        return next(self.iter_matches(text), None) is not None
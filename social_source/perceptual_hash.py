@@ -0,0 +1,42 @@
+"""
+Perceptual Hashing
+64-bit pHash/dHash fingerprints of images and video frames that survive
+resizing and recompression; similar images differ in few bits
+"""
+
+import cv2
+import numpy as np
+
+HASH_BITS = 64
+
+def to_gray(image):
+    """Grayscale view of a BGR, BGRA or already grayscale OpenCV image"""
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def _pack(bits):
+    """64 booleans -> 16-digit hex string"""
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return f"{value:016x}"
+
+def phash(image):
+    """DCT hash: low-frequency 8x8 coefficients of a 32x32 thumbnail against their median"""
+    small = cv2.resize(to_gray(image), (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    # The DC term only encodes overall brightness
+    median = np.median(low.flatten()[1:])
+    return _pack(low > median)
+
+def dhash(image):
+    """Gradient hash: whether each pixel of a 9x8 thumbnail is brighter than its right neighbour"""
+    small = cv2.resize(to_gray(image), (9, 8), interpolation=cv2.INTER_AREA)
+    return _pack(small[:, :-1] > small[:, 1:])
+
+def hamming(hash_a, hash_b):
+    """Number of differing bits between two hex hashes"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
@@ -0,0 +1,194 @@
+"""
+Incremental Scan Manifest
+Remembers (path, size, mtime, content hash, backend doc_id) for every
+ingested file so directory re-scans only open new or modified files
+"""
+
+import os
+import sqlite3
+import hashlib
+import time
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# Manifest writes are committed every COMMIT_EVERY changes or COMMIT_INTERVAL
+# seconds, so an interrupted scan keeps what it already sent
+COMMIT_EVERY = 100
+COMMIT_INTERVAL = 5.0
+
+def file_sha256(path):
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def iter_files(directory):
+    """Yield (path, stat) for every regular file below directory, one stat per file"""
+    stack = [str(directory)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield os.path.abspath(entry.path), entry.stat()
+        except OSError as e:
+            logger.warning(f"Cannot scan {current}: {e}")
+
+class ScanManifest:
+    def __init__(self, path, commit_every=COMMIT_EVERY, commit_interval=COMMIT_INTERVAL):
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+        with self._lock:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    content_hash TEXT,
+                    doc_id TEXT
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS files_hash ON files (content_hash)")
+            self._db.commit()
+
+    def load(self, prefix=""):
+        """path -> (size, mtime_ns, content_hash) for entries below prefix"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, size, mtime_ns, content_hash FROM files WHERE path >= ? AND path < ?",
+                (prefix, prefix + "\uffff")
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def paths_with_hash(self, content_hash):
+        with self._lock:
+            rows = self._db.execute("SELECT path FROM files WHERE content_hash = ?", (content_hash,)).fetchall()
+        return [row[0] for row in rows]
+
+    def record(self, path, size, mtime_ns, content_hash, doc_id=None):
+        """Upsert a file; its previous doc_id is only kept if the content is unchanged"""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO files (path, size, mtime_ns, content_hash, doc_id) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "content_hash = excluded.content_hash, doc_id = CASE "
+                "WHEN files.content_hash = excluded.content_hash THEN COALESCE(excluded.doc_id, files.doc_id) "
+                "ELSE excluded.doc_id END",
+                (path, size, mtime_ns, content_hash, doc_id)
+            )
+            self._changed()
+
+    def move(self, old_path, new_path, size, mtime_ns):
+        """Re-point an entry at the file's new location, keeping its hash and doc_id"""
+        with self._lock:
+            self._db.execute("DELETE FROM files WHERE path = ?", (new_path,))
+            self._db.execute("UPDATE files SET path = ?, size = ?, mtime_ns = ? WHERE path = ?",
+                             (new_path, size, mtime_ns, old_path))
+            self._changed()
+
+    def set_doc_id(self, path, doc_id):
+        with self._lock:
+            self._db.execute("UPDATE files SET doc_id = ? WHERE path = ?", (doc_id, path))
+            self._changed()
+
+    def remove(self, paths):
+        with self._lock:
+            self._db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in paths])
+            self._changed()
+
+    def _changed(self):
+        """Count a write (lock held) and commit once enough have piled up"""
+        self._uncommitted += 1
+        if (self._uncommitted >= self.commit_every
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self._commit()
+
+    def _commit(self):
+        self._db.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def commit(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        self.commit()
+        self._db.close()
+
+def plan_rescan(directory, manifest):
+    """
+    Compare a directory with the manifest. Unchanged files (same size and
+    mtime) are never opened; only new or modified files are hashed.
+    Returns a dict with the counts and the files that need processing.
+    """
+    root = os.path.abspath(str(directory))
+    known = manifest.load(prefix=os.path.join(root, ""))
+    seen = set()
+    candidates = []
+    unchanged = 0
+
+    for path, stat in iter_files(root):
+        seen.add(path)
+        entry = known.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            unchanged += 1
+        else:
+            candidates.append((path, stat))
+
+    gone = set(known) - seen
+    to_process = []
+    moved = 0
+    touched = 0
+
+    for path, stat in candidates:
+        try:
+            content_hash = file_sha256(path)
+        except OSError as e:
+            logger.warning(f"Cannot read {path}: {e}")
+            continue
+
+        entry = known.get(path)
+        if entry and entry[2] == content_hash:
+            # Only the mtime changed
+            manifest.record(path, stat.st_size, stat.st_mtime_ns, content_hash)
+            touched += 1
+            continue
+
+        old_path = next((p for p in manifest.paths_with_hash(content_hash) if p in gone), None)
+        if old_path:
+            manifest.move(old_path, path, stat.st_size, stat.st_mtime_ns)
+            gone.discard(old_path)
+            moved += 1
+            continue
+
+        to_process.append((path, stat.st_size, stat.st_mtime_ns, content_hash))
+
+    manifest.remove(gone)
+    manifest.commit()
+
+    logger.info(
+        f"Rescan of {root}: {unchanged} unchanged, {touched} touched, {moved} moved, "
+        f"{len(gone)} removed, {len(to_process)} to process"
+    )
+    return {
+        "unchanged": unchanged,
+        "touched": touched,
+        "moved": moved,
+        "removed": len(gone),
+        "to_process": to_process
+    }
@@ -0,0 +1,295 @@
+"""
+Streaming Trend Engine
+Sliding-window Count-Min sketches and Space-Saving heavy-hitter summaries
+over terms, domains, subreddits and channels of every collected item.
+Answers "top / rising in the last 1h or 24h" in constant memory, and
+snapshots its state to disk so a restart keeps the windows.
+"""
+
+import os
+import re
+import gzip
+import json
+import time
+import base64
+import hashlib
+import threading
+from array import array
+from urllib.parse import urlsplit
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("terms", "domains", "subreddits", "channels")
+# window -> (bucket seconds, buckets per window). Each ring holds two windows'
+# worth of buckets so the current window can be compared with the one before.
+WINDOWS = {"1h": (300, 12), "24h": (3600, 24)}
+# Only the start of long documents (e.g. PDF chunks) is tokenized
+TERM_TEXT_CHARS = 5000
+TOKEN_PATTERN = re.compile(r"[^\W\d_][\w'-]{2,}")
+STOPWORDS = frozenset("""
+    the and for are but not you all any can had her was one our out day get has him his how man new now
+    old see two way who boy did its let put say she too use that with have this will your from they know
+    want been good much some time very when come here just like long make many more only over such take
+    than them well were what into about after again also back because before being between both could
+    does down each even first most other said should still their then there these those through under
+    until where which while would http https www com reddit video file sample post posts
+""".split())
+
+def _hash_pair(key):
+    """Two independent 64-bit hashes, stable across processes (unlike hash())"""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+class CountMinSketch:
+    """Approximate counts (never under-estimated) in width * depth counters"""
+
+    def __init__(self, width=1024, depth=4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('I', bytes(4 * width)) for _ in range(depth)]
+
+    def _cells(self, key):
+        h1, h2 = _hash_pair(key)
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        # Conservative update: only raise the counters that are at the minimum
+        cells = self._cells(key)
+        target = min(row[cell] for row, cell in zip(self.rows, cells)) + count
+        for row, cell in zip(self.rows, cells):
+            if row[cell] < target:
+                row[cell] = target
+
+    def estimate(self, key):
+        return min(row[cell] for row, cell in zip(self.rows, self._cells(key)))
+
+    def clear(self):
+        for row in self.rows:
+            row[:] = array('I', bytes(4 * self.width))
+
+    def to_dict(self):
+        return [base64.b64encode(row.tobytes()).decode("ascii") for row in self.rows]
+
+    def load(self, rows):
+        for row, encoded in zip(self.rows, rows):
+            row[:] = array('I', base64.b64decode(encoded))
+
+class SpaceSaving:
+    """The capacity most frequent keys, each with its count and maximum over-count"""
+
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self.counts = {}
+
+    def add(self, key, count=1):
+        entry = self.counts.get(key)
+        if entry is not None:
+            entry[0] += count
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[key] = [count, 0]
+            return
+        # Replace the least frequent key; the newcomer inherits its count as error
+        victim = min(self.counts, key=lambda k: self.counts[k][0])
+        floor = self.counts.pop(victim)[0]
+        self.counts[key] = [floor + count, floor]
+
+    def clear(self):
+        self.counts.clear()
+
+    def to_dict(self):
+        # A copy, so it can be serialized while add() keeps running
+        return {key: list(entry) for key, entry in self.counts.items()}
+
+class SlidingWindow:
+    """Ring of fixed-length time buckets, each with its own sketch and heavy hitters"""
+
+    def __init__(self, bucket_seconds, window_buckets, width, depth, capacity):
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = window_buckets
+        ring_size = 2 * window_buckets
+        self.starts = [None] * ring_size
+        self.sketches = [CountMinSketch(width, depth) for _ in range(ring_size)]
+        self.heavy = [SpaceSaving(capacity) for _ in range(ring_size)]
+
+    def _index(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def add(self, key, timestamp):
+        index = self._index(timestamp)
+        slot = index % len(self.starts)
+        if self.starts[slot] != index:
+            # The bucket last held data from a full ring ago
+            self.starts[slot] = index
+            self.sketches[slot].clear()
+            self.heavy[slot].clear()
+        self.sketches[slot].add(key)
+        self.heavy[slot].add(key)
+
+    def _slots(self, now, windows_back):
+        """Ring slots of the window ending now (0) or of the window before it (1)"""
+        newest = self._index(now) - windows_back * self.window_buckets
+        for index in range(newest - self.window_buckets + 1, newest + 1):
+            slot = index % len(self.starts)
+            if self.starts[slot] == index:
+                yield slot
+
+    def candidates(self, now):
+        keys = set()
+        for slot in self._slots(now, 0):
+            keys.update(self.heavy[slot].counts)
+        return keys
+
+    def count(self, key, now, windows_back=0):
+        return sum(self.sketches[slot].estimate(key) for slot in self._slots(now, windows_back))
+
+    def to_dict(self):
+        """A snapshot that shares no mutable state with the ring"""
+        return {
+            "starts": list(self.starts),
+            "sketches": [sketch.to_dict() for sketch in self.sketches],
+            "heavy": [heavy.to_dict() for heavy in self.heavy]
+        }
+
+    def load(self, state):
+        self.starts = state["starts"]
+        for sketch, rows in zip(self.sketches, state["sketches"]):
+            sketch.load(rows)
+        for heavy, counts in zip(self.heavy, state["heavy"]):
+            heavy.counts = counts
+
+def _domain(url):
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+class TrendEngine:
+    def __init__(self, snapshot_path=None, width=1024, depth=4, capacity=200,
+                 snapshot_interval=300, clock=time.time):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.clock = clock
+        self._params = {"width": width, "depth": depth, "capacity": capacity, "windows": WINDOWS}
+        self._windows = {
+            dimension: {
+                name: SlidingWindow(bucket_seconds, buckets, width, depth, capacity)
+                for name, (bucket_seconds, buckets) in WINDOWS.items()
+            }
+            for dimension in DIMENSIONS
+        }
+        self._lock = threading.Lock()
+        self._last_saved = clock()
+        self.items_observed = 0
+        self._load()
+
+    def extract(self, source, type, content_text="", metadata=None):
+        """Keys an item contributes to each dimension (each counted once per item)"""
+        metadata = metadata if isinstance(metadata, dict) else {}
+        text = " ".join(str(metadata.get(key) or "") for key in ("title", "text"))
+        text = f"{text} {content_text or ''}"[:TERM_TEXT_CHARS].casefold()
+        terms = {token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS}
+
+        domain = metadata.get("source_domain") or _domain(metadata.get("url") or metadata.get("link") or "")
+        subreddit = metadata.get("subreddit")
+        channel = metadata.get("channel") or metadata.get("channel_title")
+        return {
+            "terms": terms,
+            "domains": {domain.lower()} if domain else set(),
+            "subreddits": {subreddit.lower()} if subreddit else set(),
+            "channels": {channel} if channel else set()
+        }
+
+    def observe(self, source, type, content_text="", metadata=None):
+        """Count one collected item; matches BackendSink listener arguments"""
+        keys = self.extract(source, type, content_text, metadata)
+        now = self.clock()
+        with self._lock:
+            for dimension, values in keys.items():
+                for window in self._windows[dimension].values():
+                    for value in values:
+                        window.add(value, now)
+            self.items_observed += 1
+            save_due = self.snapshot_path and now - self._last_saved >= self.snapshot_interval
+        if save_due:
+            self.save()
+
+    def top(self, dimension, window="1h", k=10):
+        """Most frequent keys in the window: [{key, count}]"""
+        now = self.clock()
+        with self._lock:
+            ring = self._windows[dimension][window]
+            counts = [{"key": key, "count": ring.count(key, now)} for key in ring.candidates(now)]
+        counts.sort(key=lambda item: item["count"], reverse=True)
+        return counts[:k]
+
+    def rising(self, dimension, window="1h", k=10, min_count=3):
+        """Keys growing fastest against the previous window: [{key, count, previous, growth}]"""
+        now = self.clock()
+        with self._lock:
+            ring = self._windows[dimension][window]
+            trending = []
+            for key in ring.candidates(now):
+                count = ring.count(key, now)
+                if count < min_count:
+                    continue
+                previous = ring.count(key, now, windows_back=1)
+                trending.append({
+                    "key": key,
+                    "count": count,
+                    "previous": previous,
+                    "growth": round((count + 1) / (previous + 1), 2)
+                })
+        trending.sort(key=lambda item: (item["growth"], item["count"]), reverse=True)
+        return trending[:k]
+
+    def report(self, k=10):
+        """Rising keys for every window and dimension"""
+        return {
+            window: {dimension: self.rising(dimension, window, k) for dimension in DIMENSIONS}
+            for window in WINDOWS
+        }
+
+    def save(self):
+        """Atomically write a gzip JSON snapshot of every window"""
+        if not self.snapshot_path:
+            return
+        # Everything is copied under the lock; observe() may run during json.dump
+        with self._lock:
+            state = {
+                "params": self._params,
+                "saved_at": self.clock(),
+                "items_observed": self.items_observed,
+                "windows": {
+                    dimension: {name: ring.to_dict() for name, ring in rings.items()}
+                    for dimension, rings in self._windows.items()
+                }
+            }
+            self._last_saved = state["saved_at"]
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.error(f"Could not save trend snapshot {self.snapshot_path}: {e}")
+
+    def _load(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with gzip.open(self.snapshot_path, 'rt', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable trend snapshot {self.snapshot_path}: {e}")
+            return
+        # JSON turns the window tuples into lists
+        if state.get("params") != json.loads(json.dumps(self._params)):
+            logger.warning("Trend snapshot was taken with different settings - starting empty")
+            return
+        for dimension, rings in state["windows"].items():
+            for name, ring_state in rings.items():
+                self._windows[dimension][name].load(ring_state)
+        self.items_observed = state.get("items_observed", 0)
+        logger.info(f"Loaded trend snapshot from {self.snapshot_path}")
@@ -1,9 +1,12 @@
 import os
+import time
+import hashlib
 import tweepy
 import requests
 import json
 from dotenv import load_dotenv
 import logging
+from backend_sink import get_default_sink
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,19 +16,26 @@ load_dotenv()
 
 # Environment variables
 TWITTER_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
-API_BASE_URL = os.getenv("API_BASE_URL", "https://misinformation-collector-322893934340.asia-south1.run.app")
+
+# get_tweets accepts at most 100 IDs per call
+MAX_IDS_PER_REQUEST = 100
+TWEET_FIELDS = ["author_id", "created_at", "text", "public_metrics", "context_annotations"]
 
 # Validate environment variables
 if not TWITTER_BEARER_TOKEN:
     logger.warning("TWITTER_BEARER_TOKEN environment variable not set - Twitter functionality disabled")
     client = None
+    bulk_client = None
 else:
     try:
         client = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN)
+        # Raw responses so the scheduler can read the x-rate-limit-* headers
+        bulk_client = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN, return_type=requests.Response)
         logger.info("Twitter client initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize Twitter client: {e}")
         client = None
+        bulk_client = None
 
 def get_tweet(tweet_id):
     """Get tweet data and optionally send to backend"""
@@ -65,39 +75,174 @@ def get_tweet(tweet_id):
         logger.error(f"Error retrieving tweet {tweet_id}: {e}")
         raise
 
-def send_tweet_to_backend(tweet_data):
-    """Send tweet data to the backend service"""
+class RateLimitScheduler:
+    """
+    Paces calls to a rate-limited Twitter endpoint.
+    Reads x-rate-limit-remaining / x-rate-limit-reset from every response and
+    sleeps until the window resets instead of letting TooManyRequests end the run.
+    """
+    
+    def __init__(self, max_retries=5, sleep=time.sleep, clock=time.time):
+        self.max_retries = max_retries
+        self.remaining = None
+        self.reset_at = None
+        self._sleep = sleep
+        self._clock = clock
+
+    def update(self, headers):
+        """Record the rate-limit window reported by the API"""
+        if not headers:
+            return
+        remaining = headers.get("x-rate-limit-remaining")
+        reset_at = headers.get("x-rate-limit-reset")
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset_at is not None:
+            self.reset_at = int(reset_at)
+
+    def wait(self):
+        """Sleep until the current window resets if it is exhausted"""
+        if self.remaining is None or self.remaining > 0 or self.reset_at is None:
+            return
+        delay = self.reset_at - self._clock() + 1
+        if delay > 0:
+            logger.info(f"Twitter rate limit reached, sleeping {delay:.0f}s until reset")
+            self._sleep(delay)
+        self.remaining = None
+
+    def call(self, func, *args, **kwargs):
+        """Call func, waiting out rate limits and retrying on 429"""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self.wait()
+            try:
+                response = func(*args, **kwargs)
+            except tweepy.TooManyRequests as e:
+                last_error = e
+                self.update(getattr(e.response, "headers", None))
+                self.remaining = 0
+                if self.reset_at is None or self.reset_at <= self._clock():
+                    # No usable reset header - fall back to exponential backoff
+                    self.reset_at = int(self._clock() + 2 ** attempt * 15)
+                logger.warning(f"Twitter API rate limit exceeded (attempt {attempt + 1})")
+                continue
+            self.update(getattr(response, "headers", None))
+            return response
+        logger.error(f"Twitter rate limit still exceeded after {self.max_retries} retries")
+        raise last_error
+
+def _load_checkpoint(checkpoint_path, fingerprint):
+    """Return the offset to resume from, or 0 if the checkpoint is missing or stale"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return 0
     try:
-        payload = {
-            "source": "twitter",
-            "type": "tweet",
-            "content_text": tweet_data["text"],
-            "metadata": json.dumps({
-                "tweet_id": tweet_data["tweet_id"],
-                "author_id": tweet_data["author_id"],
-                "created_at": tweet_data["created_at"],
-                "public_metrics": tweet_data.get("public_metrics", {}),
-                "context_annotations": tweet_data.get("context_annotations", [])
-            })
-        }
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {checkpoint_path}: {e}")
+        return 0
+    if state.get("fingerprint") != fingerprint:
+        logger.warning("Checkpoint belongs to a different ID list - starting from the beginning")
+        return 0
+    return state.get("next_offset", 0)
+
+def _save_checkpoint(checkpoint_path, fingerprint, next_offset, total):
+    """Atomically record how far through the ID list we are"""
+    if not checkpoint_path:
+        return
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"fingerprint": fingerprint, "next_offset": next_offset, "total": total}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+def _build_tweet_data(tweet):
+    """Convert a raw v2 API tweet object into our tweet record"""
+    return {
+        "author_id": tweet.get("author_id"),
+        "text": tweet.get("text", ""),
+        "created_at": tweet.get("created_at"),
+        "tweet_id": tweet["id"],
+        "public_metrics": tweet.get("public_metrics", {}),
+        "context_annotations": tweet.get("context_annotations", [])
+    }
+
+def get_tweets(tweet_ids, checkpoint_path=None, scheduler=None, batch_size=MAX_IDS_PER_REQUEST,
+               confirm_batch=None):
+    """
+    Bulk-fetch tweets 100 IDs per get_tweets call, yielding records as they arrive.
+    With checkpoint_path set, progress is saved after every batch so an
+    interrupted run resumes at the first unfinished batch. confirm_batch() is
+    called before each checkpoint; if it returns False the run stops with the
+    checkpoint still at that batch.
+    """
+    if not bulk_client:
+        logger.error("Twitter client not initialized - check your TWITTER_BEARER_TOKEN")
+        return
+    
+    scheduler = scheduler or RateLimitScheduler()
+    batch_size = max(1, min(batch_size, MAX_IDS_PER_REQUEST))
+    unique_ids = list(dict.fromkeys(str(tid).strip() for tid in tweet_ids if str(tid).strip()))
+    fingerprint = hashlib.sha256("\n".join(unique_ids).encode("utf-8")).hexdigest()
+    
+    offset = _load_checkpoint(checkpoint_path, fingerprint)
+    if offset:
+        logger.info(f"Resuming bulk tweet collection at {offset}/{len(unique_ids)}")
+    
+    while offset < len(unique_ids):
+        batch = unique_ids[offset:offset + batch_size]
+        try:
+            response = scheduler.call(bulk_client.get_tweets, ids=batch, tweet_fields=TWEET_FIELDS)
+        except tweepy.Unauthorized:
+            logger.error("Twitter API unauthorized - check your bearer token")
+            raise
         
-        response = requests.post(
-            f"{API_BASE_URL}/collect",
-            json=payload,
-            timeout=30
-        )
+        body = response.json()
+        for tweet in body.get("data", []):
+            yield _build_tweet_data(tweet)
+        for error in body.get("errors", []):
+            logger.warning(f"No data found for tweet ID: {error.get('value')} ({error.get('title')})")
         
-        if response.status_code == 200:
-            result = response.json()
-            logger.info(f"Tweet sent to backend successfully: {result.get('doc_id')}")
-            return result
-        else:
-            logger.error(f"Failed to send tweet to backend: {response.status_code} - {response.text}")
-            return None
-            
-    except requests.RequestException as e:
-        logger.error(f"Error sending tweet to backend: {e}")
-        return None
+        if confirm_batch and not confirm_batch():
+            raise RuntimeError(f"Tweets {offset}-{offset + len(batch)} were not stored - checkpoint left at {offset}")
+        offset += len(batch)
+        _save_checkpoint(checkpoint_path, fingerprint, offset, len(unique_ids))
+        logger.info(f"Bulk tweet collection progress: {offset}/{len(unique_ids)}")
+
+def send_tweet_to_backend(tweet_data, wait=True):
+    """
+    Send tweet data to the backend through the shared sink.
+    With wait=True blocks for and returns the backend result (or None);
+    otherwise returns a Future so bulk collection is not held up by the backend.
+    """
+    payload = {
+        "source": "twitter",
+        "type": "tweet",
+        "content_text": tweet_data["text"],
+        "metadata": {
+            "tweet_id": tweet_data["tweet_id"],
+            "author_id": tweet_data["author_id"],
+            "created_at": tweet_data["created_at"],
+            "public_metrics": tweet_data.get("public_metrics", {}),
+            "context_annotations": tweet_data.get("context_annotations", [])
+        }
+    }
+    
+    future = get_default_sink().submit(
+        payload["source"], payload["type"], payload["content_text"], payload["metadata"]
+    )
+    if not wait:
+        return future
+    
+    result = future.result()
+    if result:
+        logger.info(f"Tweet sent to backend successfully: {result.get('doc_id')}")
+    else:
+        logger.error("Failed to send tweet to backend")
+    return result
+
+def _attach_doc_id(tweet_data, backend_result):
+    if backend_result:
+        tweet_data["backend_doc_id"] = backend_result.get("doc_id")
 
 def collect_tweet(tweet_id, send_to_backend=True):
     """Collect tweet data and optionally send to backend"""
@@ -110,6 +255,33 @@ def collect_tweet(tweet_id, send_to_backend=True):
     
     return tweet_data
 
+def collect_tweets(tweet_ids, send_to_backend=True, checkpoint_path=None):
+    """
+    Bulk-collect tweets with rate-limit pacing and resumable checkpoints.
+    Backend sends are queued on the shared sink; backend_doc_id is filled in
+    once the sink flushes. The checkpoint only moves past a batch once the
+    backend has stored all of its tweets.
+    """
+    batch_futures = []
+
+    def confirm_batch():
+        if not batch_futures:
+            return True
+        get_default_sink().flush()
+        failed = sum(1 for future in batch_futures if future.result() is None)
+        batch_futures.clear()
+        if failed:
+            logger.error(f"{failed} tweets of the batch were not stored by the backend")
+        return not failed
+
+    for tweet_data in get_tweets(tweet_ids, checkpoint_path=checkpoint_path,
+                                 confirm_batch=confirm_batch if send_to_backend else None):
+        if send_to_backend:
+            future = send_tweet_to_backend(tweet_data, wait=False)
+            future.add_done_callback(lambda f, data=tweet_data: _attach_doc_id(data, f.result()))
+            batch_futures.append(future)
+        yield tweet_data
+
 if __name__ == "__main__":
     # Example usage
     tweet_id = "1234567890123456789"  # Replace with actual tweet ID
@@ -0,0 +1,45 @@
+"""
+Collection Watermarks
+Small JSON file of per-key high-watermarks (newest item already collected)
+so incremental collectors resume where the previous run stopped
+"""
+
+import os
+import json
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class WatermarkStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks = self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable watermark file {self.path}: {e}")
+            return {}
+
+    def get(self, key):
+        with self._lock:
+            return self._marks.get(key)
+
+    def set(self, key, mark):
+        """Record a watermark and atomically rewrite the file"""
+        with self._lock:
+            self._marks[key] = mark
+            if not self.path:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._marks, f, indent=2)
+            os.replace(tmp_path, self.path)
@@ -1,9 +1,9 @@
 import os
-import requests
 import json
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
 import logging
+from backend_sink import get_default_sink
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,7 +13,6 @@ load_dotenv()
 
 # Environment variables
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-API_BASE_URL = os.getenv("API_BASE_URL", "https://misinformation-collector-322893934340.asia-south1.run.app")
 
 # Validate environment variables
 if not YOUTUBE_API_KEY:
@@ -27,6 +26,26 @@ except Exception as e:
     logger.error(f"Failed to initialize YouTube client: {e}")
     raise
 
+# videos().list accepts at most 50 comma-separated IDs per call
+MAX_IDS_PER_REQUEST = 50
+
+def _build_video_data(video):
+    """Convert a videos().list item into our video record"""
+    video_id = video['id']
+    return {
+        "video_id": video_id,
+        "title": video['snippet']['title'],
+        "description": video['snippet']['description'],
+        "publishedAt": video['snippet']['publishedAt'],
+        "channel": video['snippet']['channelTitle'],
+        "channel_id": video['snippet']['channelId'],
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "duration": video['contentDetails']['duration'],
+        "statistics": video.get('statistics', {}),
+        "tags": video['snippet'].get('tags', []),
+        "category_id": video['snippet'].get('categoryId')
+    }
+
 def get_video_details(video_id):
     """Get YouTube video details"""
     try:
@@ -39,21 +58,7 @@ def get_video_details(video_id):
             logger.warning(f"No video found for ID: {video_id}")
             return None
             
-        video = response['items'][0]
-        
-        video_data = {
-            "video_id": video_id,
-            "title": video['snippet']['title'],
-            "description": video['snippet']['description'],
-            "publishedAt": video['snippet']['publishedAt'],
-            "channel": video['snippet']['channelTitle'],
-            "channel_id": video['snippet']['channelId'],
-            "url": f"https://www.youtube.com/watch?v={video_id}",
-            "duration": video['contentDetails']['duration'],
-            "statistics": video.get('statistics', {}),
-            "tags": video['snippet'].get('tags', []),
-            "category_id": video['snippet'].get('categoryId')
-        }
+        video_data = _build_video_data(response['items'][0])
         
         logger.info(f"Successfully retrieved video: {video_id}")
         return video_data
@@ -62,44 +67,80 @@ def get_video_details(video_id):
         logger.error(f"Error retrieving video {video_id}: {e}")
         raise
 
-def send_video_to_backend(video_data):
-    """Send video data to the backend service"""
-    try:
-        payload = {
-            "source": "youtube",
-            "type": "video",
-            "content_text": f"{video_data['title']}\n\n{video_data['description']}",
-            "metadata": json.dumps({
-                "video_id": video_data["video_id"],
-                "title": video_data["title"],
-                "channel": video_data["channel"],
-                "channel_id": video_data["channel_id"],
-                "url": video_data["url"],
-                "publishedAt": video_data["publishedAt"],
-                "duration": video_data["duration"],
-                "statistics": video_data.get("statistics", {}),
-                "tags": video_data.get("tags", []),
-                "category_id": video_data.get("category_id")
-            })
-        }
+def get_videos_details(video_ids, batch_size=MAX_IDS_PER_REQUEST):
+    """
+    Get details for any number of videos, batch_size IDs per API call.
+    Yields video records as each batch comes back; IDs that the API
+    does not return (deleted, private, invalid) are logged and skipped.
+    """
+    batch_size = max(1, min(batch_size, MAX_IDS_PER_REQUEST))
+    
+    # Preserve input order but never ask for the same ID twice
+    unique_ids = list(dict.fromkeys(vid.strip() for vid in video_ids if vid and vid.strip()))
+    
+    for start in range(0, len(unique_ids), batch_size):
+        batch = unique_ids[start:start + batch_size]
+        try:
+            response = youtube.videos().list(
+                part='snippet,contentDetails,statistics',
+                id=','.join(batch),
+                maxResults=len(batch)
+            ).execute()
+        except Exception as e:
+            logger.error(f"Error retrieving video batch starting at {batch[0]}: {e}")
+            raise
         
-        response = requests.post(
-            f"{API_BASE_URL}/collect",
-            json=payload,
-            timeout=30
-        )
+        found = set()
+        for video in response.get('items', []):
+            found.add(video['id'])
+            yield _build_video_data(video)
         
-        if response.status_code == 200:
-            result = response.json()
-            logger.info(f"Video sent to backend successfully: {result.get('doc_id')}")
-            return result
-        else:
-            logger.error(f"Failed to send video to backend: {response.status_code} - {response.text}")
-            return None
-            
-    except requests.RequestException as e:
-        logger.error(f"Error sending video to backend: {e}")
-        return None
+        for missing_id in batch:
+            if missing_id not in found:
+                logger.warning(f"No video found for ID: {missing_id}")
+        
+        logger.info(f"Retrieved {len(found)}/{len(batch)} videos in batch")
+
+def send_video_to_backend(video_data, wait=True):
+    """
+    Send video data to the backend through the shared sink.
+    With wait=True blocks for and returns the backend result (or None);
+    otherwise returns a Future so bulk collection is not held up by the backend.
+    """
+    payload = {
+        "source": "youtube",
+        "type": "video",
+        "content_text": f"{video_data['title']}\n\n{video_data['description']}",
+        "metadata": {
+            "video_id": video_data["video_id"],
+            "title": video_data["title"],
+            "channel": video_data["channel"],
+            "channel_id": video_data["channel_id"],
+            "url": video_data["url"],
+            "publishedAt": video_data["publishedAt"],
+            "duration": video_data["duration"],
+            "statistics": video_data.get("statistics", {}),
+            "tags": video_data.get("tags", []),
+            "category_id": video_data.get("category_id")
+        }
+    }
+    
+    future = get_default_sink().submit(
+        payload["source"], payload["type"], payload["content_text"], payload["metadata"]
+    )
+    if not wait:
+        return future
+    
+    result = future.result()
+    if result:
+        logger.info(f"Video sent to backend successfully: {result.get('doc_id')}")
+    else:
+        logger.error("Failed to send video to backend")
+    return result
+
+def _attach_doc_id(video_data, backend_result):
+    if backend_result:
+        video_data["backend_doc_id"] = backend_result.get("doc_id")
 
 def collect_video(video_id, send_to_backend=True):
     """Collect video data and optionally send to backend"""
@@ -112,6 +153,18 @@ def collect_video(video_id, send_to_backend=True):
     
     return video_data
 
+def collect_videos(video_ids, send_to_backend=True):
+    """
+    Collect many videos with batched lookups, yielding each record.
+    Backend sends are queued on the shared sink; backend_doc_id is filled in
+    once the sink flushes (call get_default_sink().flush() to wait for it).
+    """
+    for video_data in get_videos_details(video_ids):
+        if send_to_backend:
+            future = send_video_to_backend(video_data, wait=False)
+            future.add_done_callback(lambda f, data=video_data: _attach_doc_id(data, f.result()))
+        yield video_data
+
 def extract_video_id_from_url(url):
     """Extract video ID from YouTube URL"""
     import re